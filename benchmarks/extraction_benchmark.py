@@ -0,0 +1,101 @@
+"""
+Benchmark of the HTML-to-text extraction engines over a corpus of saved pages.
+
+Usage, from the repository root:
+    python benchmarks/extraction_benchmark.py [PATH ...] [--content-cache DIR] [--max-chars N] [--processes N]
+        [--repeat N]
+
+Each PATH is an HTML file or a directory searched recursively for *.htm/*.html files. Pages downloaded by the
+ingestion can be used as well, from the content cache directory (see content-cache.dir in src/config.json).
+With --processes, pages are extracted by that many worker processes, as with extraction.processes in src/config.json.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app.services.content_cache import ContentCache
+from app.services.extraction_executor import ExtractionExecutor
+from app.services.soup_text_extractor import SoupTextExtractor
+from app.services.streaming_text_extractor import StreamingTextExtractor
+from app.services.text_extractor import TextExtractor
+
+
+def load_corpus(paths: list[str], content_cache_dir: str | None) -> list[bytes]:
+    pages: list[bytes] = []
+    if content_cache_dir is not None:
+        cache = ContentCache(content_cache_dir)
+        pages.extend(cache.read_entry(path).html for path in cache.list_entry_paths())
+    for path in paths:
+        files = (
+            [
+                os.path.join(root, name)
+                for root, _, names in os.walk(path)
+                for name in names
+            ]
+            if os.path.isdir(path)
+            else [path]
+        )
+        for file in sorted(files):
+            if file.endswith((".htm", ".html")):
+                with open(file, "rb") as f:
+                    pages.append(f.read())
+    return pages
+
+
+def run(
+    extractor: TextExtractor, pages: list[bytes], repeat: int, processes: int
+) -> tuple[float, int]:
+    best = float("inf")
+    text_chars = 0
+    extraction_executor = ExtractionExecutor(extractor, processes)
+    # As many concurrent callers as worker processes, like the page download threads of the ingestion
+    with ThreadPoolExecutor(max_workers=max(1, processes)) as threads:
+        list(threads.map(extraction_executor.extract, pages[:processes]))  # Warm-up
+        for _ in range(repeat):
+            started = time.perf_counter()
+            text_chars = sum(
+                len(text) for text in threads.map(extraction_executor.extract, pages)
+            )
+            best = min(best, time.perf_counter() - started)
+    extraction_executor.shutdown()
+    return best, text_chars
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--content-cache", metavar="DIR")
+    parser.add_argument("--max-chars", type=int, default=100000)
+    parser.add_argument("--processes", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.paths, args.content_cache)
+    if len(pages) == 0:
+        sys.exit("No pages found")
+    corpus_bytes = sum(len(page) for page in pages)
+    print(
+        f"{len(pages)} page(s), {corpus_bytes / 1024 / 1024:.1f} MiB, best of {args.repeat}, "
+        f"{args.processes} worker process(es)"
+    )
+    print(f"{'engine':<24}{'pages/s':>10}{'MiB/s':>10}{'chars/page':>12}")
+    for name, extractor in [
+        ("soup (uncapped)", SoupTextExtractor()),
+        ("soup", SoupTextExtractor(args.max_chars)),
+        ("streaming (uncapped)", StreamingTextExtractor()),
+        ("streaming", StreamingTextExtractor(args.max_chars)),
+    ]:
+        elapsed, text_chars = run(extractor, pages, args.repeat, args.processes)
+        print(
+            f"{name:<24}{len(pages) / elapsed:>10.1f}"
+            f"{corpus_bytes / 1024 / 1024 / elapsed:>10.2f}{text_chars // len(pages):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
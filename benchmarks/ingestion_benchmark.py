@@ -0,0 +1,185 @@
+"""
+Ingestion benchmark against the local stand-in server (see stand_in_server.py), so that it needs no network.
+
+Usage, from the repository root:
+    python benchmarks/ingestion_benchmark.py [--mode rss|endpoint|all] [--rounds N] [--config FILE] [--no-cache]
+        [stand-in server options, see stand_in_server.py --help]
+
+The rss mode drives RSSService.fetch_all_articles, that is fetch_articles for every feed, and the endpoint mode drives
+POST /feeds/fetch-all, scoring articles with a no-op AI service and saving them to a new SQLite database. Rounds after
+the first poll the feeds again, exercising their ETag. Each mode runs in its own process, for its peak RSS to be its
+own. The application is configured with src/config.json or the given file, with an initially empty content cache.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from stand_in_server import StandInServer, add_arguments, get_feed_path
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def serve(port: int, options: argparse.Namespace) -> None:
+    StandInServer(("127.0.0.1", port), options).serve_forever()
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_peak_rss_mib() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def percentile(values: list[float], p: float) -> float:
+    if len(values) == 0:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+def run_mode(mode: str, feed_urls: list[str], args: argparse.Namespace) -> None:
+    os.chdir(args.work_dir)
+    shutil.rmtree(os.path.join(args.work_dir, "content-cache"), ignore_errors=True)
+    # A file rather than an in-memory database, whose single connection the fetching threads would share
+    os.environ["DATABASE_URL"] = (
+        f"sqlite:///{os.path.join(args.work_dir, f'{mode}.sqlite')}"
+    )
+    # Imported here, once the working directory holds the configuration to use
+    from app import create_app
+    from app.db import db
+    from app.models.article import Article
+    from app.models.feed import Feed
+    from app.services.ai_service import AIService
+
+    class NoAIService(AIService):
+        def add_generated_summary(self, article):
+            return None
+
+        def add_generated_tags(self, article):
+            return [], [], [], []
+
+        def add_topic_scores(self, article):
+            return [], []
+
+    app = create_app("development")
+    app.ai_service = app.ingestion_service.ai_service = NoAIService()
+    rss_service = app.rss_service
+    feed_latencies: list[float] = []
+    fetch_articles = rss_service.fetch_articles
+
+    def timed_fetch_articles(feed, seen_urls=None, fetch_metric=None):
+        started = time.perf_counter()
+        try:
+            return fetch_articles(feed, seen_urls, fetch_metric)
+        finally:
+            feed_latencies.append(time.perf_counter() - started)
+
+    rss_service.fetch_articles = timed_fetch_articles
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(
+            [Feed(name=f"Stand-in {n}", url=url) for n, url in enumerate(feed_urls)]
+        )
+        db.session.commit()
+        client = app.test_client()
+        for round_number in range(1, args.rounds + 1):
+            feed_latencies.clear()
+            started = time.perf_counter()
+            if mode == "rss":
+                article_count = sum(
+                    len(articles)
+                    for _, articles in rss_service.fetch_all_articles(Feed.query.all())
+                )
+                db.session.commit()  # Keeps the feeds' validators for the next round
+            else:
+                stored = Article.query.count()
+                response = client.post("/feeds/fetch-all")
+                response.get_data()
+                article_count = Article.query.count() - stored
+            elapsed = time.perf_counter() - started
+            peak_rss = get_peak_rss_mib()
+            print(
+                f"{mode:<10}{round_number:>6}{len(feed_urls):>7}{article_count:>10}{elapsed:>9.2f}"
+                f"{article_count / elapsed:>12.1f}{percentile(feed_latencies, 50) * 1000:>9.0f}"
+                f"{percentile(feed_latencies, 99) * 1000:>9.0f}"
+                + (f"{peak_rss:>11.1f}" if peak_rss is not None else f"{'n/a':>11}"),
+                flush=True,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mode", choices=["rss", "endpoint", "all"], default="all")
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument(
+        "--config",
+        default=os.path.join(os.path.dirname(__file__), "..", "src", "config.json"),
+        help="config.json to run the application with",
+    )
+    parser.add_argument("--no-cache", dest="cache", action="store_false")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    port = get_free_port()
+    server = context.Process(target=serve, args=(port, args), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"{base_url}/", timeout=1)
+        except urllib.error.HTTPError:
+            break  # Up and running: the root is a 404
+        except OSError:
+            time.sleep(0.1)
+    feed_urls = [f"{base_url}{get_feed_path(n)}" for n in range(args.feeds)]
+
+    args.work_dir = tempfile.mkdtemp(prefix="ingestion-benchmark-")
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config["content-cache.dir"] = (
+        os.path.join(args.work_dir, "content-cache") if args.cache else None
+    )
+    with open(os.path.join(args.work_dir, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f)
+    print(
+        f"{args.entries} entries per feed, {args.page_bytes} bytes per page, {args.latency}+{args.jitter}s latency, "
+        f"{args.error_rate:.0%} errors, ETag {'on' if args.etag else 'off'}"
+    )
+    print(
+        f"{'mode':<10}{'round':>6}{'feeds':>7}{'articles':>10}{'seconds':>9}{'articles/s':>12}"
+        f"{'p50 ms':>9}{'p99 ms':>9}{'peak MiB':>11}"
+    )
+    try:
+        for mode in ["rss", "endpoint"] if args.mode == "all" else [args.mode]:
+            process = context.Process(target=run_mode, args=(mode, feed_urls, args))
+            process.start()
+            process.join()
+    finally:
+        server.terminate()
+        shutil.rmtree(args.work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Local stand-in for feed publishers: serves synthetic RSS/Atom feeds and the article pages they link to.
+
+Usage, from the repository root:
+    python benchmarks/stand_in_server.py [--port N] [--feeds N] [--entries N] [--page-bytes N] [--latency S]
+        [--jitter S] [--error-rate P] [--no-etag]
+
+Feeds are served at /feeds/<n>.rss (even n) or /feeds/<n>.atom (odd n), and their articles at
+/articles/<n>/<entry>.html. Every response is delayed by the latency, plus a random jitter, and fails with a 503 at
+the given error rate. Unless disabled, feeds carry an ETag and answer 304 to a matching If-None-Match.
+"""
+
+import argparse
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "advisory market energy policy supply chain climate trade regulation shipping tariff security grid "
+    "investment labour inflation research outlook region industry forecast"
+).split()
+
+FIRST_PUBLISHED = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def get_feed_path(n: int) -> str:
+    return f"/feeds/{n}.{'atom' if n % 2 else 'rss'}"
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    options: argparse.Namespace
+
+    def __init__(self, address: tuple[str, int], options: argparse.Namespace) -> None:
+        super().__init__(address, StandInRequestHandler)
+        self.options = options
+        self._random = random.Random(options.seed)
+        self._random_lock = threading.Lock()
+        self._pages: dict[int, bytes] = {}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def random(self) -> float:
+        with self._random_lock:
+            return self._random.random()
+
+    def render_feed(self, n: int, atom: bool) -> bytes:
+        entries = [
+            (
+                f"{self.base_url}/articles/{n}/{i}.html",
+                f"Article {i} of feed {n}",
+                FIRST_PUBLISHED + timedelta(hours=i),
+            )
+            for i in range(self.options.entries)
+        ]
+        if atom:
+            items = "".join(
+                f"<entry><title>{title}</title><link href='{url}'/><id>{url}</id>"
+                f"<updated>{published.isoformat()}</updated><summary>Summary of {title}</summary></entry>"
+                for url, title, published in entries
+            )
+            return (
+                "<?xml version='1.0' encoding='utf-8'?><feed xmlns='http://www.w3.org/2005/Atom'>"
+                f"<title>Feed {n}</title><id>{self.base_url}/feeds/{n}</id>{items}</feed>"
+            ).encode("utf-8")
+        items = "".join(
+            f"<item><title>{title}</title><link>{url}</link><guid>{url}</guid>"
+            f"<pubDate>{format_datetime(published, usegmt=True)}</pubDate>"
+            f"<description>Summary of {title}</description></item>"
+            for url, title, published in entries
+        )
+        return (
+            "<?xml version='1.0' encoding='utf-8'?><rss version='2.0'><channel>"
+            f"<title>Feed {n}</title><link>{self.base_url}</link>{items}</channel></rss>"
+        ).encode("utf-8")
+
+    def render_page(self, n: int, i: int) -> bytes:
+        # The body is generated once per size, then only the heading differs between articles
+        size = self.options.page_bytes
+        if size not in self._pages:
+            rng = random.Random(self.options.seed)
+            paragraphs: list[str] = []
+            length = 0
+            while length < size:
+                paragraph = f"<p>{' '.join(rng.choices(WORDS, k=60))}.</p>\n"
+                paragraphs.append(paragraph)
+                length += len(paragraph)
+            self._pages[size] = "".join(paragraphs).encode("utf-8")
+        return (
+            b"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Stand-in</title>"
+            b"<script>window.analytics = {track: function () {}};</script></head><body>"
+            b"<header><nav><a href='/'>Home</a> <a href='/about'>About</a></nav></header><article>"
+            + f"<h1>Article {i} of feed {n}</h1>".encode("utf-8")
+            + self._pages[size]
+            + b"</article><footer>Stand-in publisher</footer></body></html>"
+        )
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    server: StandInServer
+
+    FEED_PATH = re.compile(r"^/feeds/(\d+)\.(rss|atom)$")
+    PAGE_PATH = re.compile(r"^/articles/(\d+)/(\d+)\.html$")
+
+    def do_GET(self) -> None:
+        options = self.server.options
+        delay = options.latency + options.jitter * self.server.random()
+        if delay > 0:
+            time.sleep(delay)
+        if self.server.random() < options.error_rate:
+            self._send(HTTPStatus.SERVICE_UNAVAILABLE, b"Unavailable", "text/plain")
+        elif match := self.FEED_PATH.match(self.path):
+            n, atom = int(match.group(1)), match.group(2) == "atom"
+            # The feeds never change, so their ETag only depends on what they are made of
+            etag = f'"feed-{n}-{options.entries}"'
+            headers = {"ETag": etag} if options.etag else {}
+            if options.etag and self.headers.get("If-None-Match") == etag:
+                self._send(HTTPStatus.NOT_MODIFIED, b"", None, headers)
+            else:
+                content_type = "application/atom+xml" if atom else "application/rss+xml"
+                self._send(
+                    HTTPStatus.OK,
+                    self.server.render_feed(n, atom),
+                    content_type,
+                    headers,
+                )
+        elif match := self.PAGE_PATH.match(self.path):
+            page = self.server.render_page(int(match.group(1)), int(match.group(2)))
+            self._send(HTTPStatus.OK, page, "text/html; charset=utf-8")
+        else:
+            self._send(HTTPStatus.NOT_FOUND, b"Not Found", "text/plain")
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send(
+        self,
+        status: HTTPStatus,
+        body: bytes,
+        content_type: str | None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if content_type is not None:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the stand-in server to the parser, so that other scripts can start one."""
+    parser.add_argument("--feeds", type=int, default=20)
+    parser.add_argument("--entries", type=int, default=20, help="entries per feed")
+    parser.add_argument("--page-bytes", type=int, default=100 * 1024)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per response"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="extra random seconds per response"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of 503 responses"
+    )
+    parser.add_argument("--no-etag", dest="etag", action="store_false")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+    server = StandInServer((args.host, args.port), args)
+    print(f"Serving {args.feeds} feed(s) at {server.base_url}/feeds/<n>.rss|atom")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from typing import cast
 
+import click
 from flask import Flask, Response, g, jsonify, request
 from flask_migrate import Migrate
 from sqlalchemy.exc import IntegrityError
@@ -11,14 +12,21 @@ from app.exceptions.request_validation_error import RequestValidationError
 from app.routes.article_routes import article_bp
 from app.routes.feed_routes import feed_bp
 from app.routes.graphql.ariadne import graphql_bp
+from app.routes.job_routes import job_bp
 from app.routes.label_routes import label_bp
 from app.routes.topic_routes import topic_bp
 from app.routes.user_routes import user_bp
 from app.services.article_service import ArticleService
 from app.services.fake_auth_service import FakeAuthService
+from app.services.feed_scheduler_service import FeedSchedulerService
+from app.services.fetch_metrics_service import FetchMetricsService
 from app.services.hugging_face_service import HuggingFaceService
+from app.services.ingestion_service import IngestionService
+from app.services.job_service import JobService
 from app.services.rss_service import RSSService
+from app.services.scoring_service import ScoringService
 from app.typing import FlaskWithServices
+from app.workers.ingestion_worker import IngestionWorker
 
 migrate = Migrate()
 
@@ -36,6 +44,7 @@ def create_app(config_name: str = "development") -> FlaskWithServices:
 
     app.register_blueprint(article_bp)
     app.register_blueprint(feed_bp)
+    app.register_blueprint(job_bp)
     app.register_blueprint(label_bp)
     app.register_blueprint(topic_bp)
     app.register_blueprint(user_bp)
@@ -44,6 +53,7 @@ def create_app(config_name: str = "development") -> FlaskWithServices:
 
     register_error_handlers(app)
     register_audit_context(app)
+    register_commands(app)
 
     db.init_app(app)
 
@@ -53,7 +63,14 @@ def create_app(config_name: str = "development") -> FlaskWithServices:
     app.ai_service = HuggingFaceService(config_obj)
     app.article_service = ArticleService(config_obj)
     app.auth_service = FakeAuthService(config_obj)
-    app.rss_service = RSSService(config_obj)
+    app.feed_scheduler_service = FeedSchedulerService(config_obj)
+    app.fetch_metrics_service = FetchMetricsService(config_obj)
+    app.job_service = JobService(config_obj)
+    app.rss_service = RSSService(config_obj, app.feed_scheduler_service)
+    app.scoring_service = ScoringService(config_obj, app.ai_service, app.job_service)
+    app.ingestion_service = IngestionService(
+        config_obj, app.rss_service, app.ai_service, app.fetch_metrics_service
+    )
 
     return app
 
@@ -71,6 +88,29 @@ def register_audit_context(app):
         g.audit_change_reason = request.headers.get("X-Change-Reason", None)
 
 
+def register_commands(app):
+    @app.cli.command("ingestion-worker")
+    @click.option(
+        "--once", is_flag=True, help="Exit once there are no claimable jobs left."
+    )
+    @click.option(
+        "--poll-interval",
+        default=5.0,
+        show_default=True,
+        help="Seconds to wait for new jobs when the queue is empty.",
+    )
+    @click.option(
+        "--schedule",
+        is_flag=True,
+        help="Also queue the feeds that are due for a poll. Enable it on a single worker.",
+    )
+    def run_ingestion_worker(once: bool, poll_interval: float, schedule: bool) -> None:
+        """Run a background worker that processes queued ingestion jobs."""
+        IngestionWorker(
+            cast(FlaskWithServices, app), poll_interval=poll_interval, schedule=schedule
+        ).run(once)
+
+
 def register_error_handlers(app):
     @app.errorhandler(IntegrityError)
     def handle_integrity_error(err: IntegrityError) -> tuple[Response, int]:
@@ -0,0 +1,8 @@
+class FeedFetchError(Exception):
+    url: str
+    status: int | None
+
+    def __init__(self, url: str, status: int | None, cause: object = None):
+        super().__init__(f"Failed to fetch feed {url} (status {status}): {cause}")
+        self.url = url
+        self.status = status
@@ -0,0 +1,6 @@
+class LeaseLostError(Exception):
+    job_id: int
+
+    def __init__(self, job_id: int):
+        super().__init__(f"Lost the lease on IngestionJob {job_id}")
+        self.job_id = job_id
@@ -12,7 +12,7 @@ from sqlalchemy import (
     false,
 )
 from sqlalchemy.ext.associationproxy import association_proxy
-from sqlalchemy.orm import Mapped, relationship
+from sqlalchemy.orm import Mapped, deferred, relationship
 
 from app.db import db
 from app.models.article_tie import ArticleTie
@@ -23,6 +23,7 @@ from app.models.mixins.serializer import SerializerMixin
 from app.models.scored_label import ScoredLabel
 from app.models.scored_topic import ScoredTopic
 from app.models.tag import Tag
+from app.models.types.compressed_text import CompressedText
 
 
 class Article(DefaultValuesMixin, AuditMixin, SerializerMixin, db.Model):
@@ -35,8 +36,9 @@ class Article(DefaultValuesMixin, AuditMixin, SerializerMixin, db.Model):
     url: Mapped[str] = Column(String(4000), unique=True, nullable=False)
     title: Mapped[str] = Column(Text, nullable=False)
     summary: Mapped[str] = Column(Text, nullable=False)
-    ai_summary: Mapped[str] = Column(Text)
-    full_text: Mapped[str] = Column(Text)
+    ai_summary: Mapped[str] = Column(CompressedText())
+    # Loaded on first access only, as most queries do not need the (decompressed) full text of the articles
+    full_text: Mapped[str] = deferred(Column(CompressedText()))
     published: Mapped[datetime] = Column(DateTime, nullable=False)
     following: Mapped[bool] = Column(
         Boolean, default=False, server_default=false(), nullable=False
@@ -19,6 +19,9 @@ class Feed(DefaultValuesMixin, AuditMixin, SerializerMixin, db.Model):
     name: Mapped[str] = Column(String(100), unique=True, nullable=False)
     url: Mapped[str] = Column(String(4000), unique=True, nullable=False)
     last_fetch: Mapped[datetime] = Column(DateTime)
+    # HTTP validators returned by the server on the last successful poll, sent back to allow a 304 Not Modified.
+    etag: Mapped[str] = Column(String(1000))
+    last_modified: Mapped[str] = Column(String(100))
     enabled: Mapped[bool] = Column(
         Boolean, default=True, server_default=true(), nullable=False
     )
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Text
+from sqlalchemy.orm import Mapped, relationship
+
+from app.db import db
+from app.models.feed import Feed
+from app.models.mixins.default_values import DefaultValuesMixin
+from app.models.mixins.serializer import SerializerMixin
+
+
+class FeedFetchMetric(DefaultValuesMixin, SerializerMixin, db.Model):
+    """
+    Counts and stage durations of a single poll of a feed, from the download of the feed document to the commit of its
+    articles. Only the latest polls of each feed are kept, see FetchMetricsService. Durations are in milliseconds, page
+    durations being summed over the pages although they are downloaded concurrently.
+    """
+
+    __Plural__ = "FeedFetchMetrics"
+    __singular__ = "feed_fetch_metric"
+    __tablename__ = "feed_fetch_metrics"
+    __table_args__ = (Index("ix_feed_fetch_metrics_feed_id_id", "feed_id", "id"),)
+
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    feed_id: Mapped[int] = Column(Integer, ForeignKey(Feed.id), nullable=False)
+    started: Mapped[datetime] = Column(DateTime, nullable=False)
+    http_status: Mapped[int] = Column(Integer)
+    feed_bytes: Mapped[int] = Column(Integer, default=0, nullable=False)
+    entry_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    new_article_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    page_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    page_cache_hit_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    page_error_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    page_bytes: Mapped[int] = Column(Integer, default=0, nullable=False)
+    processed_article_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    feed_fetch_ms: Mapped[int] = Column(Integer, default=0, nullable=False)
+    parse_ms: Mapped[int] = Column(Integer, default=0, nullable=False)
+    page_fetch_ms: Mapped[int] = Column(Integer, default=0, nullable=False)
+    extraction_ms: Mapped[int] = Column(Integer, default=0, nullable=False)
+    scoring_ms: Mapped[int] = Column(Integer, default=0, nullable=False)
+    save_ms: Mapped[int] = Column(Integer, default=0, nullable=False)
+    total_ms: Mapped[int] = Column(Integer, default=0, nullable=False)
+    error: Mapped[str] = Column(Text)
+
+    feed: Mapped[Feed] = relationship(Feed, lazy="select")
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, relationship
+
+from app.db import db
+from app.models.feed import Feed
+from app.models.mixins.default_values import DefaultValuesMixin
+from app.models.mixins.serializer import SerializerMixin
+
+
+class FeedSchedule(DefaultValuesMixin, SerializerMixin, db.Model):
+    """
+    Polling state of a feed, kept apart from the feed itself so that polls do not fill its history. A feed without a
+    schedule has never been polled by the scheduler and is due right away.
+    """
+
+    __Plural__ = "FeedSchedules"
+    __singular__ = "feed_schedule"
+    __tablename__ = "feed_schedules"
+
+    feed_id: Mapped[int] = Column(Integer, ForeignKey(Feed.id), primary_key=True)
+    next_poll: Mapped[datetime] = Column(DateTime, index=True)
+    last_poll: Mapped[datetime] = Column(DateTime)
+    # Seconds between two polls while the feed is healthy, adapted after each poll to how often it publishes.
+    poll_interval: Mapped[int] = Column(Integer, nullable=False)
+    consecutive_failures: Mapped[int] = Column(Integer, default=0, nullable=False)
+    last_article_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+
+    feed: Mapped[Feed] = relationship(Feed, lazy="select")
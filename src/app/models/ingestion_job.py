@@ -0,0 +1,90 @@
+from datetime import datetime
+from enum import Enum
+from typing import List
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.orm import Mapped, relationship
+
+from app.db import db
+from app.models.feed import Feed
+from app.models.mixins.default_values import DefaultValuesMixin
+from app.models.mixins.serializer import SerializerMixin
+from app.models.server_side.sd_utc_now import SDUTCNow
+
+
+class JobStatus(Enum):
+    QUEUED = 1
+    RUNNING = 2
+    SUCCEEDED = 3
+    FAILED = 4
+
+
+JOB_STATUS_LENGTH = max(len(status.name) for status in JobStatus)
+
+
+class IngestionJobFeed(DefaultValuesMixin, SerializerMixin, db.Model):
+    """Progress of a single feed within an ingestion job."""
+
+    __Plural__ = "IngestionJobFeeds"
+    __singular__ = "ingestion_job_feed"
+    __tablename__ = "ingestion_job_feeds"
+
+    job_id: Mapped[int] = Column(
+        Integer, ForeignKey("ingestion_jobs.id"), primary_key=True
+    )
+    feed_id: Mapped[int] = Column(Integer, ForeignKey(Feed.id), primary_key=True)
+    status: Mapped[str] = Column(
+        String(JOB_STATUS_LENGTH), default=JobStatus.QUEUED.name, nullable=False
+    )
+    article_fetch_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    article_process_count: Mapped[int] = Column(Integer, default=0, nullable=False)
+    started: Mapped[datetime] = Column(DateTime)
+    finished: Mapped[datetime] = Column(DateTime)
+    error: Mapped[str] = Column(Text)
+
+    job = relationship("IngestionJob", back_populates="feeds")
+    feed: Mapped[Feed] = relationship(Feed, lazy="joined")
+
+    feed_name: Mapped[str] = association_proxy("feed", "name")
+
+
+class IngestionJob(DefaultValuesMixin, SerializerMixin, db.Model):
+    """
+    Unit of background work. Workers claim queued jobs by taking a time-limited lease on them, so that a job whose
+    worker died becomes claimable again once its lease expires.
+    """
+
+    __Plural__ = "IngestionJobs"
+    __singular__ = "ingestion_job"
+    __tablename__ = "ingestion_jobs"
+    __table_args__ = (
+        Index("ix_ingestion_jobs_status_available_at", "status", "available_at"),
+    )
+
+    id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = Column(String(50), nullable=False)
+    payload: Mapped[str] = Column(Text)
+    status: Mapped[str] = Column(
+        String(JOB_STATUS_LENGTH), default=JobStatus.QUEUED.name, nullable=False
+    )
+    attempts: Mapped[int] = Column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = Column(Integer, default=3, nullable=False)
+    created: Mapped[datetime] = Column(
+        DateTime, server_default=SDUTCNow(), nullable=False
+    )
+    available_at: Mapped[datetime] = Column(
+        DateTime, server_default=SDUTCNow(), nullable=False
+    )
+    lease_owner: Mapped[str] = Column(String(100))
+    lease_expires: Mapped[datetime] = Column(DateTime)
+    started: Mapped[datetime] = Column(DateTime)
+    finished: Mapped[datetime] = Column(DateTime)
+    error: Mapped[str] = Column(Text)
+
+    feeds: Mapped[List[IngestionJobFeed]] = relationship(
+        IngestionJobFeed,
+        back_populates="job",
+        cascade="all,delete-orphan",
+        lazy="select",
+    )
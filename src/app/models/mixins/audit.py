@@ -1,3 +1,4 @@
+from collections import defaultdict
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Iterable, TYPE_CHECKING, cast
@@ -14,7 +15,7 @@ from sqlalchemy import (
     and_,
     event,
 )
-from sqlalchemy.orm import foreign, relationship
+from sqlalchemy.orm import Session, foreign, object_session, relationship
 from stringcase import snakecase
 
 from app.db import db
@@ -34,6 +35,9 @@ EVENT_TO_CHANGE_TYPE = {
     "after_delete": ChangeType.DELETE,
 }
 
+# Key of the session info entry holding the history rows logged during a flush, per history table.
+PENDING_HISTORY_KEY = "audit_pending_history"
+
 
 class AuditMetaMixin:
     if TYPE_CHECKING:
@@ -193,6 +197,59 @@ class AuditMixin(AuditMetaMixin):
             for id_name, ref_id_name in zip(model_id_col_names, ref_id_col_names):
                 values[ref_id_name] = getattr(target, id_name)
 
-            connection.execute(history_cls.__table__.insert().values(**values))
+            session = object_session(target)
+            if session is None:
+                connection.execute(history_cls.__table__.insert().values(**values))
+            else:
+                # Inserted at the end of the flush, together with the rest of the history of the same table
+                session.info.setdefault(PENDING_HISTORY_KEY, defaultdict(list))[
+                    history_cls.__table__
+                ].append(values)
 
         return log
+
+
+def insert_bulk_history(
+    session: Session, cls: type[db.Model], rows: list[dict], change_type: ChangeType
+) -> None:
+    """
+    Log the history of rows written with bulk statements, which the history listeners of the model do not see. Each
+    row holds the values of all the columns of the model, primary key included, after the change.
+    """
+    if len(rows) == 0:
+        return
+    history_table = cls.history.property.mapper.class_.__table__
+    id_col_names = [c.name for c in cls.__table__.columns if c.primary_key]
+    change_date = datetime.now(timezone.utc)
+    change_user_id = getattr(g, "audit_user_id", "N/A")
+    change_reason = getattr(g, "audit_change_reason", None)
+    history_rows = []
+    for row in rows:
+        values = {
+            name: value
+            for name, value in row.items()
+            if name not in id_col_names and name in history_table.columns
+        }
+        values["change_type"] = change_type.name
+        values["change_date"] = change_date
+        values["change_user_id"] = change_user_id
+        values["change_reason"] = change_reason
+        for id_name in id_col_names:
+            values[f"{snakecase(cls.__singular__)}_{id_name}"] = row[id_name]
+        history_rows.append(values)
+    session.connection().execute(history_table.insert(), history_rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _insert_pending_history(session: Session, flush_context) -> None:
+    pending_history = session.info.pop(PENDING_HISTORY_KEY, None)
+    if pending_history:
+        connection = session.connection()
+        for history_table, rows in pending_history.items():
+            connection.execute(history_table.insert(), rows)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_history(session: Session, previous_transaction) -> None:
+    # A failed flush leaves behind the history of rows that were never written
+    session.info.pop(PENDING_HISTORY_KEY, None)
@@ -0,0 +1,35 @@
+import zlib
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+
+class CompressedText(TypeDecorator):
+    """
+    Text stored zlib-compressed in a binary column, transparently to the model: values are compressed when written and
+    decompressed when read. Values still stored as plain text, say rows written before the column got compressed, are
+    read as they are. Being compressed, the column can no longer be searched with LIKE.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    compression_level: int
+
+    def __init__(self, compression_level: int = 6, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.compression_level = compression_level
+
+    def process_bind_param(self, value: str | None, dialect) -> bytes | None:
+        if value is None:
+            return None
+        return zlib.compress(value.encode("utf-8"), self.compression_level)
+
+    def process_result_value(self, value: bytes | str | None, dialect) -> str | None:
+        if value is None or isinstance(value, str):
+            return value
+        return zlib.decompress(value).decode("utf-8")
+
+    @property
+    def python_type(self) -> type:
+        return str
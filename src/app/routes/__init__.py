@@ -1,5 +1,6 @@
 from flask import Blueprint, Response, jsonify, request
 from flask_sqlalchemy.model import Model
+from sqlalchemy.orm import undefer
 from stringcase import snakecase
 
 from app import db
@@ -66,7 +67,8 @@ def set_up_common_routes(
 
     @bp.get("/")
     def list_objs() -> tuple[Response, int]:
-        objs = cls.query.all()
+        # Deferred columns are serialized too: loaded upfront rather than with a query per object
+        objs = cls.query.options(undefer("*")).all()
         return jsonify(
             {
                 snakecase(cls.__Plural__): [obj.to_dict(*expands) for obj in objs],
@@ -153,6 +153,17 @@ def unfollow_article(id_value: int) -> tuple[Response, int]:
     ), 204
 
 
+@article_bp.get("/ai-cache/stats")
+def get_ai_cache_stats() -> tuple[Response, int]:
+    return jsonify(
+        {
+            "ai_cache_stats": app.ai_service.get_cache_stats(),
+            "result": "ok",
+            "message": "AI cache statistics",
+        }
+    ), 200
+
+
 @article_bp.post("/<int:id_value>/summarize")
 def generate_ai_summary(id_value: int) -> tuple[Response, int]:
     article = Article.query.get_or_404(id_value)
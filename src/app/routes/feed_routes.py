@@ -1,13 +1,21 @@
 import json
-from datetime import timezone
 from typing import Generator, cast
 
-from flask import Blueprint, Response, current_app, stream_with_context
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    request,
+    stream_with_context,
+)
 
-from app.db import db
+from app.exceptions.request_validation_error import RequestValidationError
 from app.models.article import Article
 from app.models.feed import Feed, FeedHistory
+from app.models.feed_fetch_metric import FeedFetchMetric
 from app.routes import set_up_common_routes
+from app.services.ingestion_service import IngestionService
 from app.typing import FlaskWithServices
 
 feed_bp = Blueprint("feeds", __name__, url_prefix="/feeds")
@@ -18,74 +26,33 @@ app = cast(FlaskWithServices, current_app)
 
 
 @feed_bp.post("/fetch-all")
-def fetch_articles() -> Response:
+def fetch_articles() -> Response | tuple[Response, int]:
+    if request.args.get("background", "false").lower() in ("1", "true", "yes"):
+        return enqueue_fetch_articles()
+
     total_articles_fetched = 0
     total_articles_processed = 0
+    fetch_metrics: dict[int, FeedFetchMetric] = {}
 
-    def process_article(feed: Feed, article: Article) -> object:
-        ai_service = app.ai_service
-        with db.session.no_autoflush:
-            scored_labels, scored_topics = ai_service.add_topic_scores(article)
-            db.session.add(article)
-            db.session.add_all(scored_labels)
-            db.session.add_all(scored_topics)
-            if feed.last_fetch is None or feed.last_fetch.astimezone(
-                timezone.utc
-            ) < article.published.astimezone(timezone.utc):
-                feed.last_fetch = article.published
-                db.session.add(feed)
-            db.session.commit()
-
-        return {
-            "article": article.to_dict(),
-            "scored_topics": [st.to_dict() for st in scored_topics],
-            "scored_labels": [sl.to_dict() for sl in scored_labels],
-            "status": "processed and saved",
-        }
-
-    def build_article_response(
-        feed: Feed, article: Article, lbound_datetime
-    ) -> tuple[int, str]:
-        result: tuple[int, str]
+    def generate_feed_response(
+        feed: Feed, articles: list[Article]
+    ) -> Generator[str, None, None]:
         nonlocal total_articles_fetched
-        total_articles_fetched += 1
-        if lbound_datetime is None or lbound_datetime.astimezone(
-            timezone.utc
-        ) < article.published.astimezone(timezone.utc):
-            result = 1, json.dumps(process_article(feed, article))
-            nonlocal total_articles_processed
-            total_articles_processed += 1
-        else:
-            result = (
-                0,
-                json.dumps(
-                    {"article": article.to_dict(), "status": "not processed nor saved"}
-                ),
-            )
-        return result
-
-    def generate_feed_response(feed: Feed) -> Generator[str, None, None]:
-        current_call_last_fetch = feed.last_fetch
+        nonlocal total_articles_processed
         yield '{"feed":'
         yield json.dumps(feed.to_dict())
         yield ',\n"articles":[\n'
-        articles = app.rss_service.fetch_articles(feed)
         article_process_count = 0
-        if len(articles) > 0:
-            # noinspection PyTypeChecker
-            processed, article_response = build_article_response(
-                feed, articles[0], current_call_last_fetch
-            )
-            article_process_count += processed
-            yield article_response
-            for article in articles[1:]:
-                yield ",\n"
-                # noinspection PyTypeChecker
-                processed, article_response = build_article_response(
-                    feed, article, current_call_last_fetch
-                )
-                article_process_count += processed
-                yield article_response
+        separator = ""
+        for processed, article_response in app.ingestion_service.ingest_feed_articles(
+            feed, articles, fetch_metrics.get(feed.id)
+        ):
+            total_articles_fetched += 1
+            total_articles_processed += int(processed)
+            article_process_count += int(processed)
+            yield separator
+            yield json.dumps(article_response)
+            separator = ",\n"
         yield (
             '\n],"article_fetch_count":'
             + str(len(articles))
@@ -95,15 +62,13 @@ def fetch_articles() -> Response:
         )
 
     def generate_response() -> Generator[str, None, None]:
-        feeds = Feed.query.all()
+        feeds = Feed.query.filter(Feed.enabled).all()
         yield '{"feeds":[\n'
-        if len(feeds) > 0:
-            yield from generate_feed_response(feeds[0])
-            for feed in feeds[1:]:
-                yield ",\n"
-                yield from generate_feed_response(feed)
-        nonlocal total_articles_fetched
-        nonlocal total_articles_processed
+        separator = ""
+        for feed, articles in app.rss_service.fetch_all_articles(feeds, fetch_metrics):
+            yield separator
+            yield from generate_feed_response(feed, articles)
+            separator = ",\n"
         yield (
             '\n],"result":"ok","message":"'
             + f"Fetched {total_articles_fetched} article(s) from {len(feeds)} feed(s), of which {total_articles_processed} got processed."
@@ -116,3 +81,48 @@ def fetch_articles() -> Response:
         mimetype="application/x-ndjson",
         status=202,
     )
+
+
+def enqueue_fetch_articles() -> tuple[Response, int]:
+    feed_ids = [
+        feed_id
+        for (feed_id,) in Feed.query.filter(Feed.enabled).with_entities(Feed.id).all()
+    ]
+    job = app.job_service.enqueue(IngestionService.FETCH_FEEDS_JOB, feed_ids=feed_ids)
+    return jsonify(
+        {
+            "ingestion_job": job.to_dict("feeds"),
+            "result": "ok",
+            "message": f"IngestionJob {job.id} queued for {len(feed_ids)} feed(s)",
+        }
+    ), 202
+
+
+@feed_bp.get("/stats")
+def get_all_stats() -> tuple[Response, int]:
+    order_by = request.args.get("order_by", "total_ms")
+    if order_by not in app.fetch_metrics_service.DURATION_FIELDS:
+        raise RequestValidationError(
+            f"Unknown order_by, expected one of: {', '.join(app.fetch_metrics_service.DURATION_FIELDS)}."
+        )
+    stats = app.fetch_metrics_service.get_all_stats(order_by)
+    return jsonify(
+        {
+            "feed_stats": stats,
+            "result": "ok",
+            "message": f"Fetch metrics of {len(stats)} feed(s), slowest {order_by} first",
+        }
+    ), 200
+
+
+@feed_bp.get("/<int:id_value>/stats")
+def get_stats(id_value: int) -> tuple[Response, int]:
+    Feed.query.get_or_404(id_value)
+    stats = app.fetch_metrics_service.get_feed_stats(id_value)
+    return jsonify(
+        {
+            "feed_stats": stats,
+            "result": "ok",
+            "message": f"Feed id={id_value} has metrics for {stats['fetch_count']} fetch(es)",
+        }
+    ), 200
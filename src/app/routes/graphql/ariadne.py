@@ -38,8 +38,14 @@ from app.models.scored_label_topic_view import ScoredLabelTopic
 from app.models.tag import Tag, TagHistory
 from app.models.topic import Topic, TopicHistory
 from app.models.topic_label import TopicLabel, TopicLabelHistory
+from app.models.types.compressed_text import CompressedText
 from app.models.user import User, UserHistory
 
+
+class CompressedStr(str):
+    """Type of the CompressedText fields: compressed in the database, they can only be filtered on by equality."""
+
+
 SUPPORTED_TYPES: dict[type, type] = {
     bool: bool,
     date: date,
@@ -208,7 +214,12 @@ def get_fields(model) -> dict[str, tuple[type, bool, bool]]:
     fields = {}
     inspected_model = sa_inspect(model)
     for column in inspected_model.columns:
-        col_type = SUPPORTED_TYPES.get(getattr(column.type, "python_type", None), str)
+        if isinstance(column.type, CompressedText):
+            col_type = CompressedStr
+        else:
+            col_type = SUPPORTED_TYPES.get(
+                getattr(column.type, "python_type", None), str
+            )
         fields[column.key] = (col_type, False, column.nullable)
     for attr_name, attr in [
         (attr_name, getattr(model, attr_name, None))
@@ -0,0 +1,59 @@
+from typing import cast
+
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from app.models.ingestion_job import IngestionJob, JobStatus
+from app.typing import FlaskWithServices
+
+app = cast(FlaskWithServices, current_app)
+
+job_bp = Blueprint("jobs", __name__, url_prefix="/jobs")
+
+
+@job_bp.get("/")
+def list_jobs() -> tuple[Response, int]:
+    query = IngestionJob.query
+    status = request.args.get("status", None)
+    if status is not None:
+        query = query.filter(IngestionJob.status == status.upper())
+    jobs = query.order_by(IngestionJob.id.desc()).limit(100).all()
+    return jsonify(
+        {
+            "ingestion_jobs": [job.to_dict() for job in jobs],
+            "result": "ok",
+            "message": f"{len(jobs)} IngestionJob found",
+        }
+    ), 200
+
+
+@job_bp.get("/<int:id_value>")
+def get_job(id_value: int) -> tuple[Response, int]:
+    job = IngestionJob.query.get_or_404(id_value)
+    return jsonify(
+        {
+            "ingestion_job": job.to_dict("feeds"),
+            "result": "ok",
+            "message": f"IngestionJob id={id_value} is {job.status.lower()}",
+        }
+    ), 200
+
+
+@job_bp.post("/<int:id_value>/retry")
+def retry_job(id_value: int) -> tuple[Response, int]:
+    job = IngestionJob.query.get_or_404(id_value)
+    if job.status != JobStatus.FAILED.name:
+        return jsonify(
+            {
+                "ingestion_job": job.to_dict("feeds"),
+                "result": "ok",
+                "message": f"IngestionJob {job.id} is {job.status.lower()}, only failed jobs can be retried",
+            }
+        ), 200  # or error 409
+    app.job_service.retry(job)
+    return jsonify(
+        {
+            "ingestion_job": job.to_dict("feeds"),
+            "result": "ok",
+            "message": f"IngestionJob {job.id} queued again",
+        }
+    ), 202
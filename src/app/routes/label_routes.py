@@ -1,4 +1,6 @@
-from flask import Blueprint, Response, jsonify, request
+from typing import cast
+
+from flask import Blueprint, Response, current_app, jsonify, request
 
 from app.db import db
 from app.exceptions.request_validation_error import RequestValidationError
@@ -6,6 +8,9 @@ from app.models.label import Label, LabelHistory
 from app.models.topic import Topic
 from app.models.topic_label import TopicLabel
 from app.routes import set_up_common_routes
+from app.typing import FlaskWithServices
+
+app = cast(FlaskWithServices, current_app)
 
 label_bp = Blueprint("labels", __name__, url_prefix="/labels")
 
@@ -15,7 +20,7 @@ set_up_common_routes(label_bp, Label, LabelHistory, "label_id")
 @label_bp.post("/<int:id_value>/topic/<int:topic_id>")
 def add_to_topic(id_value: int, topic_id: int) -> tuple[Response, int]:
     data = request.get_json()
-    if not hasattr(data, "weight"):
+    if "weight" not in data:
         raise RequestValidationError("Missing weight.")
     weight = data.get("weight")
     label = Label.query.get_or_404(id_value)
@@ -30,10 +35,13 @@ def add_to_topic(id_value: int, topic_id: int) -> tuple[Response, int]:
     )
     db.session.add(topic_label)
     db.session.commit()
+    # Existing articles get scored against the label in the background
+    job = app.scoring_service.enqueue_label_scoring([label.id])
     return jsonify(
         {
             "topic_label": topic_label.to_dict(),
+            "ingestion_job": job.to_dict(),
             "result": "ok",
-            "message": f"TopicLabel {topic_label.id} created",
+            "message": f"Label {label.id} added to Topic {topic.id}",
         }
     ), 201
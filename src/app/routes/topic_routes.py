@@ -47,10 +47,13 @@ def add_label(id_value: int) -> tuple[Response, int]:
     db.session.add(label)
     db.session.add(topic_label)
     db.session.commit()
+    # Existing articles get scored against the new label in the background
+    job = app.scoring_service.enqueue_label_scoring([label.id])
     return jsonify(
         {
             "label": label.to_dict(),
             "topic_label": topic_label.to_dict(),
+            "ingestion_job": job.to_dict(),
             "result": "ok",
             "message": f"Label {label.id} created under Topic {topic.id} created",
         }
@@ -107,17 +110,43 @@ def get_labels(id_value: int) -> tuple[Response, int]:
     ), 200
 
 
+@topic_bp.put("/<int:id_value>/label/<int:label_id>")
+def update_label(id_value: int, label_id: int) -> tuple[Response, int]:
+    data = request.get_json()
+    if "weight" not in data and "enabled" not in data:
+        raise RequestValidationError("Missing parameters: weight or enabled.")
+
+    topic_label = TopicLabel.query.get_or_404((id_value, label_id))
+    was_enabled = topic_label.enabled
+    if "weight" in data:
+        topic_label.weight = data["weight"]
+    if "enabled" in data:
+        topic_label.enabled = data["enabled"]
+    db.session.flush()
+    # Label scores are unchanged, the scores of the topic are recomputed from them along with the edit
+    score_count = app.scoring_service.recompute_topic_scores([id_value])
+    db.session.commit()
+    job = None
+    if topic_label.enabled and not was_enabled:
+        # Articles saved while the label was disabled have no score for it yet
+        job = app.scoring_service.enqueue_label_scoring([label_id])
+    return jsonify(
+        {
+            "topic_label": topic_label.to_dict(),
+            "ingestion_job": None if job is None else job.to_dict(),
+            "result": "ok",
+            "message": f"Label {label_id} updated under Topic {id_value}, {score_count} scores changed",
+        }
+    ), 200
+
+
 @topic_bp.delete("/<int:id_value>/label/<int:label_id>")
 def remove_label(id_value: int, label_id: int) -> tuple[Response, int]:
-    topic = (
-        Topic.query.options(
-            joinedload(Topic.topic_labels)
-            .joinedload(TopicLabel.labels)
-            .joinedload(Label.topic_labels)
-        )
-        .filter(Label.id == label_id)
-        .get_or_404(id_value)
-    )
+    topic = Topic.query.options(
+        joinedload(Topic.topic_labels)
+        .joinedload(TopicLabel.label)
+        .joinedload(Label.topic_labels)
+    ).get_or_404(id_value)
 
     topic_label = next(
         (tl for tl in topic.topic_labels if tl.label.id == label_id), None
@@ -127,12 +156,19 @@ def remove_label(id_value: int, label_id: int) -> tuple[Response, int]:
         abort(404, description=f"Label {label_id} not found under Topic {id_value}")
 
     label = topic_label.label
-    db.session.delete(topic_label)
-    if len(label.topic_labels) == 1:
+    other_topic_ids = [
+        tl.topic_id for tl in label.topic_labels if tl is not topic_label
+    ]
+    if len(other_topic_ids) == 0:
+        # Its topic label is deleted along with it
         db.session.delete(label)
         message = f"Label {label_id} was deleted"
     else:
-        message = f"Label {label_id} was detached from Topic {topic.id}, but it is still attached to topics {[tl.topic_id for tl in label.topic_labels]}"
+        db.session.delete(topic_label)
+        message = f"Label {label_id} was detached from Topic {topic.id}, but it is still attached to topics {other_topic_ids}"
+    db.session.flush()
+    # The scores of the topic no longer count the label
+    app.scoring_service.recompute_topic_scores([id_value])
     db.session.commit()
 
     return jsonify(
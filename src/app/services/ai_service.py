@@ -25,3 +25,33 @@ class AIService(ABC):
         self, article: Article
     ) -> tuple[list[ScoredLabel], list[ScoredTopic]]:
         pass
+
+    def add_topic_scores_batch(
+        self, articles: list[Article]
+    ) -> list[tuple[list[ScoredLabel], list[ScoredTopic]]]:
+        """
+        Score several articles at once, returning the scores of each one in the same order. Scores them one by one
+        unless overridden by a service that can send the articles in batched requests.
+        """
+        return [self.add_topic_scores(article) for article in articles]
+
+    def add_label_scores_batch(
+        self, articles: list[Article], label_ids: list[int]
+    ) -> list[list[ScoredLabel]]:
+        """
+        Score several articles against the given labels only, returning the scored labels of each one in the same
+        order. Scores the articles against every label unless overridden, keeping the given ones.
+        """
+        wanted = set(label_ids)
+        return [
+            [
+                scored_label
+                for scored_label in scored_labels
+                if scored_label.label_id in wanted
+            ]
+            for scored_labels, _ in self.add_topic_scores_batch(articles)
+        ]
+
+    def get_cache_stats(self) -> dict[str, dict]:
+        """Return the statistics of the caches of the service, per cache, none unless overridden."""
+        return {}
@@ -0,0 +1,36 @@
+import hashlib
+
+from app.services.sqlite_lru_store import SQLiteLRUStore
+
+
+class ClassificationCache(SQLiteLRUStore[float]):
+    """
+    Cache of zero-shot classification scores, one per text, hypothesis template, candidate label and model, kept in
+    memory up to max_entries and, if given a path, in an SQLite database up to max_stored_entries, so that they
+    survive restarts and are shared between processes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100000,
+        path: str | None = None,
+        max_stored_entries: int = 1000000,
+    ) -> None:
+        super().__init__(
+            "classification_scores", "REAL", max_entries, path, max_stored_entries
+        )
+
+    @staticmethod
+    def get_keys(
+        model: str, text: str, hypothesis: str, labels: list[str]
+    ) -> dict[str, str]:
+        """Return the key of each label, the text being hashed only once for all of them."""
+        text_hash = hashlib.sha256(
+            "\0".join([model, hypothesis, text, ""]).encode("utf-8")
+        )
+        keys: dict[str, str] = {}
+        for label in labels:
+            label_hash = text_hash.copy()
+            label_hash.update(label.encode("utf-8"))
+            keys[label] = label_hash.hexdigest()
+        return keys
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from typing import NamedTuple
+
+
+class CachedContent(NamedTuple):
+    html: bytes
+    text: str | None
+    stored: float
+
+
+class ContentCache:
+    """
+    On-disk cache of downloaded pages, keeping both the raw HTML and the text extracted from it, zlib-compressed in
+    one file per key hash, the key being the URL of the page or any string identifying it. Once the cache grows over max_bytes, the least recently used entries are evicted. Entries
+    older than ttl seconds, if set, are treated as missing.
+    """
+
+    # Entry header: time it was stored, then length of the HTML that precedes the extracted text
+    _HEADER = struct.Struct("<dQ")
+
+    compression_level: int
+    directory: str
+    max_bytes: int
+    ttl: float | None
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float | None = None,
+        compression_level: int = 6,
+    ) -> None:
+        self.compression_level = compression_level
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._list_entries())
+
+    def get(self, key: str) -> CachedContent | None:
+        path = self._get_path(key)
+        try:
+            entry = self.read_entry(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(e, file=sys.stderr)  # TODO: Deal with error
+            self._remove(path)
+            return None
+        if self.ttl is not None and entry.stored + self.ttl < time.time():
+            self._remove(path)
+            return None
+        try:
+            # The modification time tracks the last use, for the LRU eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def list_entry_paths(self) -> list[str]:
+        return [path for path, _, _ in self._list_entries()]
+
+    def read_entry(self, path: str) -> CachedContent:
+        with open(path, "rb") as f:
+            data = zlib.decompress(f.read())
+        stored, html_length = self._HEADER.unpack_from(data)
+        html_end = self._HEADER.size + html_length
+        text = data[html_end:].decode("utf-8") if len(data) > html_end else None
+        return CachedContent(data[self._HEADER.size : html_end], text, stored)
+
+    def put(self, key: str, html: bytes, text: str | None) -> None:
+        data = self._HEADER.pack(time.time(), len(html)) + html
+        if text is not None:
+            data += text.encode("utf-8")
+        compressed = zlib.compress(data, self.compression_level)
+        path = self._get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside then renamed, so that concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(compressed)
+        with self._lock:
+            self._total_bytes -= self._get_size(path)
+            os.replace(tmp_path, path)
+            self._total_bytes += len(compressed)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Down to 90% of the limit, so that a full cache does not scan its directory on every put
+        target_bytes = self.max_bytes * 0.9
+        for path, size, _ in sorted(self._list_entries(), key=lambda entry: entry[2]):
+            if self._total_bytes <= target_bytes:
+                break
+            try:
+                os.remove(path)
+                self._total_bytes -= size
+            except FileNotFoundError:
+                pass
+
+    def _get_path(self, key: str) -> str:
+        key_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key_hash[:2], key_hash)
+
+    def _list_entries(self) -> list[tuple[str, int, float]]:
+        entries = []
+        for dir_entry in os.scandir(self.directory):
+            if not dir_entry.is_dir():
+                continue
+            for file_entry in os.scandir(dir_entry.path):
+                if file_entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = file_entry.stat()
+                    entries.append((file_entry.path, stat.st_size, stat.st_mtime))
+                except FileNotFoundError:
+                    pass
+        return entries
+
+    def _remove(self, path: str) -> None:
+        with self._lock:
+            size = self._get_size(path)
+            try:
+                os.remove(path)
+                self._total_bytes -= size
+            except FileNotFoundError:
+                pass
+
+    # noinspection PyMethodMayBeStatic
+    def _get_size(self, path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return 0
@@ -0,0 +1,41 @@
+import hashlib
+
+import numpy as np
+
+from app.services.sqlite_lru_store import SQLiteLRUStore
+
+
+class EmbeddingStore(SQLiteLRUStore[np.ndarray]):
+    """
+    Store of embedding vectors, one per model and text embedded, kept as float32 in memory up to max_entries and, if
+    given a path, as float32 blobs in an SQLite database up to max_stored_entries, so that texts embedded once, say
+    the summaries of the articles, are not embedded again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100000,
+        path: str | None = None,
+        max_stored_entries: int = 1000000,
+    ) -> None:
+        super().__init__(
+            "embeddings",
+            "BLOB",
+            max_entries,
+            path,
+            max_stored_entries,
+            encode=lambda vector: vector.tobytes(),
+            decode=lambda blob: np.frombuffer(blob, dtype=np.float32),
+        )
+
+    @staticmethod
+    def get_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def put_many(self, vectors: dict[str, np.ndarray]) -> None:
+        super().put_many(
+            {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in vectors.items()
+            }
+        )
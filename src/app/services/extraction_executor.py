@@ -0,0 +1,47 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from app.services.text_extractor import TextExtractor
+
+
+class ExtractionExecutor:
+    """
+    Runs the text extraction of downloaded pages in a pool of worker processes, so that parsing, which is CPU-bound
+    and holds the GIL, uses every core. With no worker processes, pages are extracted in the calling thread.
+    The pool is shut down on exit, if not by calling shutdown before.
+    """
+
+    processes: int
+    text_extractor: TextExtractor
+
+    def __init__(self, text_extractor: TextExtractor, processes: int = 0) -> None:
+        self.processes = processes
+        self.text_extractor = text_extractor
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def extract(self, html: bytes) -> str:
+        if self.processes <= 0:
+            return self.text_extractor.extract(html)
+        return self._get_pool().submit(self.text_extractor.extract, html).result()
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+                atexit.unregister(self.shutdown)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Started on first use, so that apps that never extract a page (tests, CLI commands...) spawn no processes
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned rather than forked, as forking a process that runs threads may deadlock the children
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                atexit.register(self.shutdown)
+            return self._pool
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_
+
+from app.config import Config
+from app.db import db
+from app.models.feed import Feed
+from app.models.feed_schedule import FeedSchedule
+from app.models.ingestion_job import IngestionJob, IngestionJobFeed, JobStatus
+
+
+class FeedSchedulerService:
+    """
+    Adaptive polling: each enabled feed is polled again once its own interval has elapsed. The interval shrinks while
+    polls bring new articles and grows while they do not, and failing feeds back off exponentially on top of it.
+    """
+
+    backoff_factor: float
+    default_poll_interval: int
+    max_poll_interval: int
+    min_poll_interval: int
+
+    def __init__(self, config: Config) -> None:
+        self.backoff_factor = float(config.get("scheduler.backoff-factor", 2))
+        self.default_poll_interval = int(
+            config.get("scheduler.default-poll-interval", 3600)
+        )
+        self.max_poll_interval = int(config.get("scheduler.max-poll-interval", 86400))
+        self.min_poll_interval = int(config.get("scheduler.min-poll-interval", 300))
+
+    def get_due_feeds(self, now: datetime | None = None) -> list[Feed]:
+        """Return the enabled feeds whose next poll is due and that are not already waiting in a pending job."""
+        now = now or datetime.now(timezone.utc)
+        pending_feed_ids = (
+            db.session.query(IngestionJobFeed.feed_id)
+            .join(IngestionJob)
+            .filter(
+                IngestionJob.status.in_(
+                    [JobStatus.QUEUED.name, JobStatus.RUNNING.name]
+                ),
+                IngestionJobFeed.status != JobStatus.SUCCEEDED.name,
+            )
+        )
+        return (
+            Feed.query.outerjoin(FeedSchedule, FeedSchedule.feed_id == Feed.id)
+            .filter(
+                Feed.enabled,
+                or_(FeedSchedule.next_poll.is_(None), FeedSchedule.next_poll <= now),
+                Feed.id.not_in(pending_feed_ids),
+            )
+            .order_by(FeedSchedule.next_poll.nulls_first(), Feed.id)
+            .all()
+        )
+
+    def record_poll(
+        self, feed: Feed, article_count: int, failed: bool = False
+    ) -> FeedSchedule:
+        """
+        Schedule the next poll of the feed from the outcome of the one that just happened: the number of new articles
+        it brought, or whether it failed. The change is left in the session, for the caller to commit.
+        """
+        now = datetime.now(timezone.utc)
+        schedule = db.session.get(FeedSchedule, feed.id)
+        if schedule is None:
+            schedule = FeedSchedule(
+                feed_id=feed.id,
+                poll_interval=self.default_poll_interval,
+                consecutive_failures=0,
+            )
+            db.session.add(schedule)
+        schedule.last_poll = now
+        if failed:
+            # The interval is left as it was, so that the feed resumes its pace once it recovers.
+            schedule.consecutive_failures += 1
+            delay = schedule.poll_interval * (
+                self.backoff_factor**schedule.consecutive_failures
+            )
+        else:
+            schedule.consecutive_failures = 0
+            schedule.last_article_count = article_count
+            if article_count > 0:
+                delay = schedule.poll_interval / self.backoff_factor
+            else:
+                delay = schedule.poll_interval * self.backoff_factor
+            schedule.poll_interval = self._bound(delay)
+        schedule.next_poll = now + timedelta(seconds=self._bound(delay))
+        return schedule
+
+    def _bound(self, seconds: float) -> int:
+        return int(min(self.max_poll_interval, max(self.min_poll_interval, seconds)))
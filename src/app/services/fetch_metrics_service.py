@@ -0,0 +1,136 @@
+from sqlalchemy import case, func
+
+from app.config import Config
+from app.db import db
+from app.models.feed import Feed
+from app.models.feed_fetch_metric import FeedFetchMetric
+
+
+class FetchMetricsService:
+    """
+    Rolling store of the fetch metrics of the feeds: the rows_per_feed latest polls of each feed are kept, older ones
+    being pruned as new ones are recorded, so that the table stays small however long the application runs.
+    """
+
+    DURATION_FIELDS = (
+        "feed_fetch_ms",
+        "parse_ms",
+        "page_fetch_ms",
+        "extraction_ms",
+        "scoring_ms",
+        "save_ms",
+        "total_ms",
+    )
+    COUNT_FIELDS = (
+        "feed_bytes",
+        "entry_count",
+        "new_article_count",
+        "page_count",
+        "page_cache_hit_count",
+        "page_error_count",
+        "page_bytes",
+        "processed_article_count",
+    )
+
+    rows_per_feed: int
+
+    def __init__(self, config: Config) -> None:
+        self.rows_per_feed = int(config.get("metrics.rows-per-feed", 100))
+
+    def record(self, fetch_metric: FeedFetchMetric) -> None:
+        """Add the metrics of a poll and prune the oldest ones of its feed, leaving both for the caller to commit."""
+        db.session.add(fetch_metric)
+        db.session.flush()
+        oldest_kept_id = (
+            db.session.query(FeedFetchMetric.id)
+            .filter(FeedFetchMetric.feed_id == fetch_metric.feed_id)
+            .order_by(FeedFetchMetric.id.desc())
+            .offset(self.rows_per_feed - 1)
+            .limit(1)
+            .scalar()
+        )
+        if oldest_kept_id is not None:
+            FeedFetchMetric.query.filter(
+                FeedFetchMetric.feed_id == fetch_metric.feed_id,
+                FeedFetchMetric.id < oldest_kept_id,
+            ).delete(synchronize_session=False)
+
+    def get_feed_stats(self, feed_id: int) -> dict:
+        """
+        Summarize the kept polls of a feed: totals of the counts, then the mean, median, 95th percentile and maximum
+        of each stage duration, along with the polls themselves, latest first.
+        """
+        fetch_metrics = (
+            FeedFetchMetric.query.filter(FeedFetchMetric.feed_id == feed_id)
+            .order_by(FeedFetchMetric.id.desc())
+            .all()
+        )
+        durations = {}
+        for field in self.DURATION_FIELDS:
+            values = sorted(getattr(m, field) for m in fetch_metrics)
+            durations[field] = {
+                "mean": sum(values) / len(values) if len(values) > 0 else None,
+                "p50": self._get_percentile(values, 50),
+                "p95": self._get_percentile(values, 95),
+                "max": values[-1] if len(values) > 0 else None,
+            }
+        return {
+            "feed_id": feed_id,
+            "fetch_count": len(fetch_metrics),
+            "error_count": sum(1 for m in fetch_metrics if m.error is not None),
+            "totals": {
+                field: sum(getattr(m, field) for m in fetch_metrics)
+                for field in self.COUNT_FIELDS
+            },
+            "durations": durations,
+            "fetches": [m.to_dict() for m in fetch_metrics],
+        }
+
+    def get_all_stats(self, order_by: str = "total_ms") -> list[dict]:
+        """
+        Summarize the kept polls of every feed with a single grouped query: poll and error counts, totals of the
+        counts and mean of each stage duration, sorted by decreasing mean of the order_by duration.
+        """
+        columns = [
+            FeedFetchMetric.feed_id,
+            Feed.name,
+            func.count(FeedFetchMetric.id),
+            func.sum(case((FeedFetchMetric.error.is_not(None), 1), else_=0)),
+            func.max(FeedFetchMetric.started),
+        ]
+        columns += [
+            func.sum(getattr(FeedFetchMetric, field)) for field in self.COUNT_FIELDS
+        ]
+        columns += [
+            func.avg(getattr(FeedFetchMetric, field)) for field in self.DURATION_FIELDS
+        ]
+        rows = (
+            db.session.query(*columns)
+            .join(Feed, Feed.id == FeedFetchMetric.feed_id)
+            .group_by(FeedFetchMetric.feed_id, Feed.name)
+            .order_by(func.avg(getattr(FeedFetchMetric, order_by)).desc())
+            .all()
+        )
+        stats = []
+        for feed_id, feed_name, fetch_count, error_count, last_fetch, *values in rows:
+            totals = values[: len(self.COUNT_FIELDS)]
+            means = values[len(self.COUNT_FIELDS) :]
+            stats.append(
+                {
+                    "feed_id": feed_id,
+                    "feed_name": feed_name,
+                    "fetch_count": fetch_count,
+                    "error_count": error_count,
+                    "last_fetch": last_fetch.isoformat(),
+                    "totals": dict(zip(self.COUNT_FIELDS, totals)),
+                    "mean_durations": dict(zip(self.DURATION_FIELDS, means)),
+                }
+            )
+        return stats
+
+    # noinspection PyMethodMayBeStatic
+    def _get_percentile(self, ordered_values: list[int], p: float) -> int | None:
+        if len(ordered_values) == 0:
+            return None
+        index = round(p / 100 * len(ordered_values)) - 1
+        return ordered_values[min(len(ordered_values) - 1, max(0, index))]
@@ -0,0 +1,154 @@
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.services.rate_limiter import RateLimiter
+
+
+class HttpClient:
+    """
+    Thread-safe HTTP client that keeps connections alive in a shared pool, caps the number of concurrent requests
+    per host, bounds every request with a timeout and truncates response bodies to a maximum size. Responses with a
+    status in retry_statuses, and requests failing with one of retry_exceptions, are retried up to max_retries times,
+    after the delay given by their Retry-After header or else a random one of up to retry_backoff * 2^attempt seconds
+    (full jitter), never more than max_retry_backoff.
+    Every attempt first takes a token from the rate limiter, if given, keyed by the URL requested.
+    A request given a deadline, as a time.monotonic() value, has its timeouts cut down to the time left and fails
+    with requests.Timeout once the deadline is past, even while its body is still coming in.
+    """
+
+    max_body_bytes: int | None
+    max_retries: int
+    max_retry_backoff: float
+    rate_limiter: RateLimiter | None
+    retry_backoff: float
+    retry_exceptions: tuple[type[Exception], ...]
+    retry_statuses: frozenset[int]
+    session: requests.Session
+    timeout: float | tuple[float, float]
+
+    _CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_per_host: int = 4,
+        timeout: float | tuple[float, float] = (5.0, 30.0),
+        max_body_bytes: int | None = None,
+        retry_statuses: frozenset[int] = frozenset(),
+        max_retries: int = 0,
+        retry_backoff: float = 1.0,
+        max_retry_backoff: float = 30.0,
+        rate_limiter: RateLimiter | None = None,
+        retry_exceptions: tuple[type[Exception], ...] = (),
+    ) -> None:
+        self.max_body_bytes = max_body_bytes
+        self.max_retries = max_retries
+        self.max_retry_backoff = max_retry_backoff
+        self.rate_limiter = rate_limiter
+        self.retry_backoff = retry_backoff
+        self.retry_exceptions = retry_exceptions
+        self.retry_statuses = retry_statuses
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_slots: dict[str, threading.BoundedSemaphore] = defaultdict(
+            lambda: threading.BoundedSemaphore(max_per_host)
+        )
+        self._host_slots_lock = threading.Lock()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(
+        self, method: str, url: str, deadline: float | None = None, **kwargs
+    ) -> requests.Response:
+        timeout = kwargs.pop("timeout", self.timeout)
+        attempt = 0
+        while True:
+            # Waited for before taking the host slot, as for the retry delay
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(url)
+            try:
+                with self._get_host_slot(url):
+                    response = self.session.request(
+                        method,
+                        url,
+                        stream=True,
+                        timeout=self._get_timeout(timeout, deadline),
+                        **kwargs,
+                    )
+                    try:
+                        self._read_body(response, deadline)
+                    finally:
+                        response.close()
+            except self.retry_exceptions:
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._get_retry_delay(None, attempt))
+                attempt += 1
+                continue
+            if (
+                response.status_code not in self.retry_statuses
+                or attempt >= self.max_retries
+            ):
+                return response
+            # Waited for without holding the host slot, which other requests may use meanwhile
+            time.sleep(self._get_retry_delay(response, attempt))
+            attempt += 1
+
+    def _get_retry_delay(
+        self, response: requests.Response | None, attempt: int
+    ) -> float:
+        retry_after = None if response is None else response.headers.get("Retry-After")
+        if retry_after is not None and retry_after.strip().isdigit():
+            return min(self.max_retry_backoff, float(retry_after))
+        return random.uniform(
+            0, min(self.max_retry_backoff, self.retry_backoff * 2**attempt)
+        )
+
+    # noinspection PyMethodMayBeStatic
+    def _get_timeout(
+        self, timeout: float | tuple[float, float], deadline: float | None
+    ) -> float | tuple[float, float]:
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise requests.Timeout("Deadline exceeded before sending the request")
+        if isinstance(timeout, tuple):
+            return min(timeout[0], remaining), min(timeout[1], remaining)
+        return min(timeout, remaining)
+
+    def _get_host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._host_slots_lock:
+            return self._host_slots[host]
+
+    def _read_body(self, response: requests.Response, deadline: float | None) -> None:
+        # Read at most max_body_bytes and leave them where Response.content expects them.
+        chunks: list[bytes] = []
+        size = 0
+        for chunk in response.iter_content(self._CHUNK_SIZE):
+            if deadline is not None and time.monotonic() > deadline:
+                raise requests.Timeout("Deadline exceeded while reading the body")
+            if (
+                self.max_body_bytes is not None
+                and size + len(chunk) > self.max_body_bytes
+            ):
+                chunks.append(chunk[: self.max_body_bytes - size])
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        response._content = b"".join(chunks)
+        response._content_consumed = True
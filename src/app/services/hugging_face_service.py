@@ -1,15 +1,19 @@
 # import json
 # import sys
+import hashlib
 import json
-from collections import defaultdict
+import os
+from concurrent.futures import ThreadPoolExecutor
 
 # from dataclasses import dataclass
 from decimal import Decimal
+from http import HTTPStatus
+from typing import Any
 
+import numpy as np
 import requests
 
-from app.config import Config
-from app.db import db
+from app.config import BASE_DIR, Config
 from app.models.article import Article
 from app.models.label import Label
 from app.models.scored_label import ScoredLabel
@@ -18,6 +22,13 @@ from app.models.tag import Tag
 from app.models.topic import Topic
 from app.models.topic_label import TopicLabel
 from app.services.ai_service import AIService
+from app.services.classification_cache import ClassificationCache
+from app.services.embedding_store import EmbeddingStore
+from app.services.http_client import HttpClient
+from app.services.rate_limiter import RateLimiter
+from app.services.summary_cache import SummaryCache
+from app.services.scoring_model import ScoringModel, ScoringModelCache
+from app.services.single_flight import SingleFlight
 
 
 # @dataclass
@@ -41,11 +52,26 @@ from app.services.ai_service import AIService
 
 class HuggingFaceService(AIService):
     headers: dict[str, str]
+    classification_batch_size: int
+    classification_cache: ClassificationCache
+    classification_model: str
     classification_url: str
+    embedding_batch_size: int
+    embedding_model: str
+    embedding_store: EmbeddingStore
+    embedding_url: str
+    max_candidate_labels: int
+    classification_executor: ThreadPoolExecutor
+    http_client: HttpClient
+    scoring_mode: str
+    scoring_model_cache: ScoringModelCache
+    single_flight: SingleFlight
+    summarization_model: str
     summarization_url: str
+    summary_cache: SummaryCache
     tag_label_weighing_hypothesis: str
 
-    def __init__(self, config: Config) -> None:
+    def __init__(self, config: Config, http_client: HttpClient | None = None) -> None:
         self.headers = {
             "Authorization": f"Bearer {config.get('huggingface.access-token')}"
         }
@@ -58,22 +84,126 @@ class HuggingFaceService(AIService):
         self.summarization_url = (
             f"{base_url}/{config.get('huggingface.summarization-model')}"
         )
+        self.summarization_model = "@".join(
+            [
+                config.get("huggingface.summarization-model") or "",
+                config.get("huggingface.summarization-model-revision") or "",
+            ]
+        )
+        summary_cache_path = config.get("summary-cache.path", None)
+        self.summary_cache = SummaryCache(
+            max_entries=int(config.get("summary-cache.max-entries", 10000)),
+            max_stored_entries=int(
+                config.get("summary-cache.max-stored-entries", 100000)
+            ),
+            path=os.path.join(BASE_DIR, summary_cache_path)
+            if summary_cache_path
+            else None,
+        )
         self.tag_label_weighing_hypothesis = (
             f"{config.get('huggingface.tag-label-weighing-hypothesis')}"
         )
         self.tagging_model = f"{config.get('huggingface.tagging-model')}"
+        # Part of the cache keys, for a change of model, or of its revision, to invalidate the cached scores
+        self.classification_model = "@".join(
+            [
+                config.get("huggingface.classifier-model") or "",
+                config.get("huggingface.classifier-model-revision") or "",
+            ]
+        )
+        cache_path = config.get("classification-cache.path", None)
+        self.classification_cache = ClassificationCache(
+            max_entries=int(config.get("classification-cache.max-entries", 100000)),
+            max_stored_entries=int(
+                config.get("classification-cache.max-stored-entries", 1000000)
+            ),
+            path=os.path.join(BASE_DIR, cache_path) if cache_path else None,
+        )
+        # Labels are scored by zero-shot classification, one model pass per article and label, or by the cosine
+        # similarity of embeddings, one model pass per article and per label
+        self.scoring_mode = config.get("huggingface.scoring-mode", "zero-shot")
+        self.embedding_url = f"{base_url}/{config.get('huggingface.embedding-model')}"
+        self.embedding_model = "@".join(
+            [
+                config.get("huggingface.embedding-model") or "",
+                config.get("huggingface.embedding-model-revision") or "",
+            ]
+        )
+        embedding_store_path = config.get("embedding-store.path", None)
+        self.embedding_store = EmbeddingStore(
+            max_entries=int(config.get("embedding-store.max-entries", 100000)),
+            max_stored_entries=int(
+                config.get("embedding-store.max-stored-entries", 1000000)
+            ),
+            path=os.path.join(BASE_DIR, embedding_store_path)
+            if embedding_store_path
+            else None,
+        )
+        self.embedding_batch_size = max(
+            1, int(config.get("huggingface.embedding-batch-size", 32))
+        )
+        # Candidate labels sent together in a single classification request, 0 sending all those of a hypothesis
+        self.max_candidate_labels = max(
+            0, int(config.get("huggingface.max-candidate-labels", 50))
+        )
+        # Articles sent together in a single classification request, 1 sending each one on its own. The hosted
+        # zero-shot pipeline only takes a single text as inputs: raise it only for an endpoint taking a list of texts.
+        self.classification_batch_size = max(
+            1, int(config.get("huggingface.classification-batch-size", 1))
+        )
+        # Shared by every call, from every thread, so that they reuse the same kept-alive connections
+        pool_size = int(config.get("huggingface.pool-size", 10))
+        self.http_client = http_client or HttpClient(
+            pool_size=pool_size,
+            max_per_host=pool_size,
+            timeout=(
+                float(config.get("huggingface.connect-timeout", 5)),
+                float(config.get("huggingface.read-timeout", 60)),
+            ),
+            retry_statuses=frozenset(
+                [HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE]
+            ),
+            max_retries=int(config.get("huggingface.max-retries", 3)),
+            retry_backoff=float(config.get("huggingface.retry-backoff", 1.0)),
+            max_retry_backoff=float(config.get("huggingface.max-retry-backoff", 30)),
+            # A request timing out, or failing to connect, is retried on its own, not with the others of the article
+            retry_exceptions=(requests.Timeout, requests.ConnectionError),
+            # Shared by every thread, so that together they keep within the rate limit of each endpoint
+            rate_limiter=RateLimiter(
+                float(config.get("huggingface.rate-limit-per-second", 0)),
+                int(config.get("huggingface.rate-limit-burst", 1)),
+            ),
+        )
+        self.single_flight = SingleFlight()
+        self.scoring_model_cache = ScoringModelCache(
+            float(config.get("scoring.model-check-interval", 30))
+        )
+        # Shared by every article being scored, so that it caps the classification requests in flight overall
+        self.classification_executor = ThreadPoolExecutor(
+            max_workers=int(config.get("huggingface.max-concurrent-requests", 8)),
+            thread_name_prefix="hf-classification",
+        )
 
     def add_generated_summary(self, article: Article) -> str:
+        key = None
+        if article.full_text is not None:
+            key = self.summary_cache.get_key(
+                self.summarization_model, str(article.full_text)
+            )
+            text = self.summary_cache.get(key)
+            if text is not None:
+                article.ai_summary = text
+                return text
         payload = {"inputs": article.full_text}
-        response = requests.post(
-            self.summarization_url, headers=self.headers, json=payload
-        )
-        self._log_response(self.summarization_url, payload, response)
-        response.raise_for_status()
-        text = (response.json())[0]["summary_text"]
+        text = self._post(self.summarization_url, payload)[0]["summary_text"]
+        if key is not None:
+            self.summary_cache.put(key, text)
         article.ai_summary = text
         return text
 
+    def get_cache_stats(self) -> dict[str, dict]:
+        return {"summaries": self.summary_cache.get_stats()}
+
     def add_generated_tags(
         self, article: Article
     ) -> tuple[list[Tag], list[Topic], list[TopicLabel], list[Label]]:
@@ -93,13 +223,10 @@ class HuggingFaceService(AIService):
             ],
             "model": self.tagging_model,
         }
-        response = requests.post(
-            self.completions_url, headers=self.headers, json=payload
-        )
-        self._log_response(self.completions_url, payload, response)
-        response.raise_for_status()
         ai_tags: list[dict] = json.loads(
-            response.json()["choices"][0]["message"]["content"]
+            self._post(self.completions_url, payload)["choices"][0]["message"][
+                "content"
+            ]
         )
         # response = Fake({
         #     'choices': [{
@@ -125,18 +252,12 @@ class HuggingFaceService(AIService):
                 "hypothesis_template": self.tag_label_weighing_hypothesis,
             },
         }
-        response = requests.post(
-            self.classification_url, headers=self.headers, json=payload
-        )
-        self._log_response(self.classification_url, payload, response)
-        response.raise_for_status()
+        result = self._post(self.classification_url, payload)
         # response = Fake({
         #     'labels': ['Microsoft technologies', 'Cobalt Strike', 'RiskIQ'],
         #     'scores': [0.9, 0.95, 0.85],
         # })
-        for label_text, label_score in zip(
-            response.json()["labels"], response.json()["scores"]
-        ):
+        for label_text, label_score in zip(result["labels"], result["scores"]):
             label_weights[label_text] = label_score
 
         # Create entities
@@ -172,75 +293,277 @@ class HuggingFaceService(AIService):
     def add_topic_scores(
         self, article: Article
     ) -> tuple[list[ScoredLabel], list[ScoredTopic]]:
-        labels: list[Label] = list(
-            db.session.query(Label)
-            .join(TopicLabel)
-            .join(Topic)
-            .filter(TopicLabel.enabled.is_(True))
-            .filter(Topic.enabled.is_(True))
-            .distinct()
-            .all()
+        return self.add_topic_scores_batch([article])[0]
+
+    def add_topic_scores_batch(
+        self, articles: list[Article]
+    ) -> list[tuple[list[ScoredLabel], list[ScoredTopic]]]:
+        if len(articles) == 0:
+            return []
+        # Built once, not queried for every batch, until labels or topics change
+        scoring_model = self.scoring_model_cache.get()
+        engine = scoring_model.engine
+        label_scores, scored = self._score_articles(articles, scoring_model)
+        topic_scores, topics_scored = engine.get_topic_scores(label_scores, scored)
+        return [
+            (
+                self._get_scored_labels(
+                    article, engine.label_ids, label_scores[i], scored[i]
+                ),
+                self._get_scored_topics(
+                    article, engine.topic_ids, topic_scores[i], topics_scored[i]
+                ),
+            )
+            for i, article in enumerate(articles)
+        ]
+
+    def add_label_scores_batch(
+        self, articles: list[Article], label_ids: list[int]
+    ) -> list[list[ScoredLabel]]:
+        if len(articles) == 0:
+            return []
+        scoring_model = self.scoring_model_cache.get()
+        label_scores, scored = self._score_articles(
+            articles, scoring_model, set(label_ids)
         )
-        labels_by_strs: dict[str, dict[str, Label]] = defaultdict(dict)
-        scored_labels_by_ids: dict[int, dict[int, ScoredLabel]] = defaultdict(dict)
-        topic_labels_by_ids: dict[int, dict[int, TopicLabel]] = defaultdict(dict)
-        # scored_topics: dict[int, ScoredTopic] = {}
-        topic_scales: dict[int, Decimal] = defaultdict(Decimal)
-        all_scored_labels: list[ScoredLabel] = []
-        all_scored_topics: list[ScoredTopic] = []
-        for label in labels:
-            labels_by_strs[str(label.hypothesis)][str(label.text)] = label
-        for hypothesis, labels_by_text in labels_by_strs.items():
-            payload = {
-                "inputs": article.summary,
-                "parameters": {
-                    "candidate_labels": list(labels_by_text.keys()),
-                    "multi_label": True,
-                    "hypothesis_template": hypothesis,
-                },
-            }
-            response = requests.post(
-                self.classification_url, headers=self.headers, json=payload
+        return [
+            self._get_scored_labels(
+                article, scoring_model.engine.label_ids, label_scores[i], scored[i]
             )
-            self._log_response(self.classification_url, payload, response)
-            response.raise_for_status()
-            for label_text, label_score in zip(
-                response.json()["labels"], response.json()["scores"]
-            ):
-                label: Label = labels_by_strs.get(label_text)  # type: ignore
-                label_id: int = label.id
-                scored_label = ScoredLabel(
-                    article=article,
-                    article_id=article.id,
-                    label=label,
-                    label_id=label_id,
-                    score=Decimal(label_score),
-                )
-                all_scored_labels.append(scored_label)
-                for topic_label in label.topic_labels:
-                    topic_id: int = topic_label.topic_id
-                    scored_labels_by_ids[topic_id][label_id] = scored_label
-                    topic_labels_by_ids[topic_id][label_id] = topic_label
-                    topic_scales[topic_id] += Decimal(topic_label.weight)
-            for topic_id, scored_labels in scored_labels_by_ids.items():
-                topic_score: Decimal = Decimal("0.0")
-                topic_scale = topic_scales[topic_id]
-                topic_scale = Decimal(1.0) if topic_scale.is_zero() else topic_scale
-                for label_id, scored_label in scored_labels.items():
-                    topic_label = topic_labels_by_ids[topic_id][label_id]
-                    topic_score += Decimal(scored_label.score) * Decimal(
-                        topic_label.weight
+            for i, article in enumerate(articles)
+        ]
+
+    def _score_articles(
+        self,
+        articles: list[Article],
+        scoring_model: ScoringModel,
+        label_ids: set[int] | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score the articles against the labels of the scoring model, or only those of label_ids if given, returning
+        the article x label matrix of scores along with the mask of the labels scored.
+        """
+        return {
+            "zero-shot": self._classify_articles,
+            "embedding": self._embed_articles,
+        }[self.scoring_mode](articles, scoring_model, label_ids)
+
+    def _embed_articles(
+        self,
+        articles: list[Article],
+        scoring_model: ScoringModel,
+        label_ids: set[int] | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score the articles against the labels by the cosine similarity of their embeddings, negative similarities
+        scoring 0. Labels are embedded as their hypothesis filled in with their text.
+        """
+        engine = scoring_model.engine
+        label_texts: dict[int, str] = {
+            label_id: hypothesis.replace("{}", text)
+            for hypothesis, label_ids_by_text in scoring_model.label_ids_by_strs.items()
+            for text, label_id in label_ids_by_text.items()
+            if label_ids is None or label_id in label_ids
+        }
+        label_indexes = [engine.label_indexes[label_id] for label_id in label_texts]
+        article_vectors = self._embed([str(article.summary) for article in articles])
+        label_vectors = self._embed(list(label_texts.values()))
+        label_scores = np.zeros((len(articles), len(engine.label_ids)))
+        scored = np.zeros((len(articles), len(engine.label_ids)), dtype=bool)
+        if len(label_indexes) > 0:
+            label_scores[:, label_indexes] = np.clip(
+                article_vectors @ label_vectors.T, 0.0, 1.0
+            )
+            scored[:, label_indexes] = True
+        return label_scores, scored
+
+    def _embed(self, texts: list[str]) -> np.ndarray:
+        """
+        Return the matrix of the unit-length embeddings of the texts, one per row. Stored embeddings are reused, only
+        the texts never embedded with the model being sent, embedding_batch_size at a time.
+        """
+        keys = [
+            self.embedding_store.get_key(self.embedding_model, text) for text in texts
+        ]
+        vectors = self.embedding_store.get_many(keys)
+        missing = list(
+            {key: text for key, text in zip(keys, texts) if key not in vectors}.items()
+        )
+        batches = [
+            missing[start : start + self.embedding_batch_size]
+            for start in range(0, len(missing), self.embedding_batch_size)
+        ]
+        futures = [
+            self.classification_executor.submit(
+                self._post, self.embedding_url, {"inputs": [text for _, text in batch]}
+            )
+            for batch in batches
+        ]
+        new_vectors: dict[str, np.ndarray] = {}
+        for batch, future in zip(batches, futures):
+            for (key, _), embedding in zip(batch, future.result()):
+                vector = np.asarray(embedding, dtype=np.float32)
+                # Models without pooling return an embedding per token, averaged into one for the text
+                if vector.ndim == 2:
+                    vector = vector.mean(axis=0)
+                norm = np.linalg.norm(vector)
+                new_vectors[key] = vector / norm if norm > 0 else vector
+        self.embedding_store.put_many(new_vectors)
+        vectors.update(new_vectors)
+        if len(keys) == 0:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
+
+    def _classify_articles(
+        self,
+        articles: list[Article],
+        scoring_model: ScoringModel,
+        label_ids: set[int] | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # One request per hypothesis, batch of articles and chunk of candidate labels, all of them in flight at once:
+        # the articles wait for the slowest request only. As each label is scored on its own (multi_label), chunks of
+        # labels are scored as if sent together.
+        futures = []
+        for hypothesis, label_ids_by_text in scoring_model.label_ids_by_strs.items():
+            candidate_labels = [
+                text
+                for text, label_id in label_ids_by_text.items()
+                if label_ids is None or label_id in label_ids
+            ]
+            if len(candidate_labels) == 0:
+                continue
+            chunk_size = self.max_candidate_labels or len(candidate_labels)
+            for start in range(0, len(articles), self.classification_batch_size):
+                batch = articles[start : start + self.classification_batch_size]
+                for chunk_start in range(0, len(candidate_labels), chunk_size):
+                    future = self.classification_executor.submit(
+                        self._classify,
+                        [str(article.summary) for article in batch],
+                        candidate_labels[chunk_start : chunk_start + chunk_size],
+                        hypothesis,
                     )
-                scored_topic = ScoredTopic(
-                    article=article,
-                    article_id=article.id,
-                    topic_id=topic_id,
-                    score=topic_score / topic_scale,
-                )
-                # scored_topics[topic_id] = scored_topic
-                all_scored_topics.append(scored_topic)
-        article.scored_topics = all_scored_topics
-        return all_scored_labels, all_scored_topics
+                    futures.append((label_ids_by_text, start, future))
+        engine = scoring_model.engine
+        label_scores = np.zeros((len(articles), len(engine.label_ids)))
+        scored = np.zeros((len(articles), len(engine.label_ids)), dtype=bool)
+        for label_ids_by_text, start, future in futures:
+            for offset, scores in enumerate(future.result()):
+                for label_text, label_score in scores.items():
+                    label_index = engine.label_indexes[label_ids_by_text[label_text]]
+                    label_scores[start + offset, label_index] = label_score
+                    scored[start + offset, label_index] = True
+        return label_scores, scored
+
+    # noinspection PyMethodMayBeStatic
+    def _get_scored_labels(
+        self,
+        article: Article,
+        label_ids: list[int],
+        label_scores: np.ndarray,
+        scored: np.ndarray,
+    ) -> list[ScoredLabel]:
+        return [
+            ScoredLabel(
+                article=article,
+                article_id=article.id,
+                label_id=label_ids[label_index],
+                score=Decimal(float(label_scores[label_index])),
+            )
+            for label_index in np.flatnonzero(scored)
+        ]
+
+    # noinspection PyMethodMayBeStatic
+    def _get_scored_topics(
+        self,
+        article: Article,
+        topic_ids: list[int],
+        topic_scores: np.ndarray,
+        topics_scored: np.ndarray,
+    ) -> list[ScoredTopic]:
+        scored_topics: list[ScoredTopic] = [
+            ScoredTopic(
+                article=article,
+                article_id=article.id,
+                topic_id=topic_ids[topic_index],
+                score=Decimal(float(topic_scores[topic_index])),
+            )
+            for topic_index in np.flatnonzero(topics_scored)
+        ]
+        article.scored_topics = scored_topics
+        return scored_topics
+
+    def _classify(
+        self, texts: list[str], candidate_labels: list[str], hypothesis: str
+    ) -> list[dict[str, float]]:
+        """
+        Score each candidate label against each text with the zero-shot classification model. Cached scores are
+        reused, only the texts missing some scores being sent, with the labels missing for any of them.
+        """
+        # Scores do not depend on the other candidate labels, as each label is classified on its own (multi_label)
+        keys = [
+            self.classification_cache.get_keys(
+                self.classification_model, text, hypothesis, candidate_labels
+            )
+            for text in texts
+        ]
+        cached = self.classification_cache.get_many(
+            [key for text_keys in keys for key in text_keys.values()]
+        )
+        missing = [
+            (i, [label for label, key in text_keys.items() if key not in cached])
+            for i, text_keys in enumerate(keys)
+        ]
+        missing = [(i, labels) for i, labels in missing if len(labels) > 0]
+        if len(missing) > 0:
+            missing_labels = sorted(
+                {label for _, labels in missing for label in labels}
+            )
+            results = self._request_classification(
+                [texts[i] for i, _ in missing], missing_labels, hypothesis
+            )
+            scores: dict[str, float] = {}
+            for (i, _), result in zip(missing, results):
+                for label, label_score in result.items():
+                    scores[keys[i][label]] = label_score
+            self.classification_cache.put_many(scores)
+            cached.update(scores)
+        return [
+            {label: cached[key] for label, key in text_keys.items() if key in cached}
+            for text_keys in keys
+        ]
+
+    def _request_classification(
+        self, texts: list[str], candidate_labels: list[str], hypothesis: str
+    ) -> list[dict[str, float]]:
+        payload = {
+            # A single text is sent on its own, for endpoints that do not take batched inputs
+            "inputs": texts[0] if len(texts) == 1 else texts,
+            "parameters": {
+                "candidate_labels": candidate_labels,
+                "multi_label": True,
+                "hypothesis_template": hypothesis,
+            },
+        }
+        results = self._post(self.classification_url, payload)
+        if isinstance(results, dict):
+            results = [results]
+        return [dict(zip(result["labels"], result["scores"])) for result in results]
+
+    def _post(self, url: str, payload: dict) -> Any:
+        """
+        Post the payload to the endpoint and return the decoded response. Identical calls in flight at the same time
+        share a single request, and its decoded response, which must therefore not be modified.
+        """
+        key = hashlib.sha256(
+            f"{url}\0{json.dumps(payload, sort_keys=True)}".encode("utf-8")
+        ).hexdigest()
+        return self.single_flight.do(key, lambda: self._send(url, payload))
+
+    def _send(self, url: str, payload: dict) -> Any:
+        response = self.http_client.post(url, headers=self.headers, json=payload)
+        self._log_response(url, payload, response)
+        response.raise_for_status()
+        return response.json()
 
     def _get_tagging_prompt(self, summary_text: str) -> str:
         return f"""You are given a summary text. Extract a set of topics. Each topic must have at least one label.
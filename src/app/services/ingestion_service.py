@@ -0,0 +1,219 @@
+import time
+from datetime import datetime, timezone
+from typing import Callable, Generator
+
+from app.config import Config
+from app.db import db
+from app.exceptions.lease_lost_error import LeaseLostError
+from app.models.article import Article
+from app.models.feed import Feed
+from app.models.feed_fetch_metric import FeedFetchMetric
+from app.models.ingestion_job import IngestionJob, JobStatus
+from app.models.scored_label import ScoredLabel
+from app.models.scored_topic import ScoredTopic
+from app.services.ai_service import AIService
+from app.services.fetch_metrics_service import FetchMetricsService
+from app.services.rss_service import RSSService
+
+ScoredArticle = tuple[list[ScoredLabel], list[ScoredTopic]]
+
+
+class IngestionService:
+    """Ingestion pipeline: fetch the new articles of the feeds, score them and save them."""
+
+    FETCH_FEEDS_JOB = "fetch-feeds"
+
+    ai_service: AIService
+    batch_size: int
+    fetch_metrics_service: FetchMetricsService
+    rss_service: RSSService
+
+    def __init__(
+        self,
+        config: Config,
+        rss_service: RSSService,
+        ai_service: AIService,
+        fetch_metrics_service: FetchMetricsService,
+    ) -> None:
+        self.ai_service = ai_service
+        # Number of fetched articles per transaction, processed or not, 0 saving all the articles of a feed at once
+        self.batch_size = int(config.get("ingestion.batch-size", 0))
+        self.fetch_metrics_service = fetch_metrics_service
+        self.rss_service = rss_service
+
+    def ingest_feed_articles(
+        self,
+        feed: Feed,
+        articles: list[Article],
+        fetch_metric: FeedFetchMetric | None = None,
+    ) -> Generator[tuple[bool, dict], None, None]:
+        """
+        Process the fetched articles of a feed, yielding for each one whether it got processed and its status.
+        Articles are scored and saved batch_size at a time, and their statuses are yielded once their batch is saved.
+        The feed's new HTTP validators are only saved with the last batch, so that if a batch fails, the next poll
+        downloads the feed again rather than getting a 304 Not Modified and missing the articles left unsaved.
+        The fetch metrics of the feed, if given, get completed with the scoring and saving stages, then recorded.
+        """
+        batch_size = self.batch_size if self.batch_size > 0 else max(1, len(articles))
+        # An empty batch still gets saved: it persists the feed's HTTP validators and schedule
+        batches = [
+            articles[start : start + batch_size]
+            for start in range(0, len(articles), batch_size)
+        ] or [[]]
+        new_validators = None
+        if len(batches) > 1:
+            # Queried first, as loading the attributes of the feed may flush the new validators
+            saved_validators = self._get_saved_validators(feed)
+            new_validators = (feed.etag, feed.last_modified)
+            feed.etag, feed.last_modified = saved_validators
+        lbound_datetime = feed.last_fetch
+        scoring_seconds = 0.0
+        save_seconds = 0.0
+        processed_count = 0
+        responses: list[tuple[bool, dict]] = []
+        for index, batch in enumerate(batches):
+            yield from responses
+            new_articles = [
+                article
+                for article in batch
+                if lbound_datetime is None
+                or lbound_datetime.astimezone(timezone.utc)
+                < article.published.astimezone(timezone.utc)
+            ]
+            # Scored together, for the AI service to send as few requests as it can
+            scoring_started = time.perf_counter()
+            with db.session.no_autoflush:
+                scores = self.ai_service.add_topic_scores_batch(new_articles)
+            scoring_seconds += time.perf_counter() - scoring_started
+            processed_count += len(new_articles)
+            scores_by_article = dict(zip(new_articles, scores))
+            if new_validators is not None and index == len(batches) - 1:
+                feed.etag, feed.last_modified = new_validators
+            save_started = time.perf_counter()
+            responses = list(
+                self.save_articles(
+                    feed,
+                    [(article, scores_by_article.get(article)) for article in batch],
+                )
+            )
+            save_seconds += time.perf_counter() - save_started
+        if fetch_metric is not None:
+            fetch_metric.processed_article_count = processed_count
+            fetch_metric.scoring_ms = round(scoring_seconds * 1000)
+            fetch_metric.save_ms = round(save_seconds * 1000)
+            fetch_metric.total_ms = round(
+                (
+                    datetime.now(timezone.utc)
+                    - fetch_metric.started.astimezone(timezone.utc)
+                ).total_seconds()
+                * 1000
+            )
+            self.fetch_metrics_service.record(fetch_metric)
+            db.session.commit()
+        yield from responses
+
+    def save_articles(
+        self, feed: Feed, batch: list[tuple[Article, ScoredArticle | None]]
+    ) -> Generator[tuple[bool, dict], None, None]:
+        """
+        Save the scored articles of the batch along with the feed's last fetch in a single transaction, then yield the
+        status of each article of the batch, those without scores being left unsaved.
+        """
+        with db.session.no_autoflush:
+            for article, scores in batch:
+                if scores is None:
+                    continue
+                scored_labels, scored_topics = scores
+                db.session.add(article)
+                db.session.add_all(scored_labels)
+                db.session.add_all(scored_topics)
+                if feed.last_fetch is None or feed.last_fetch.astimezone(
+                    timezone.utc
+                ) < article.published.astimezone(timezone.utc):
+                    feed.last_fetch = article.published
+        db.session.flush()
+        # Serialized before the commit expires the rows, as reloading them would cost a SELECT per row
+        responses = [
+            (True, self._get_processed_article_response(article, *scores))
+            if scores is not None
+            else (
+                False,
+                {"article": article.to_dict(), "status": "not processed nor saved"},
+            )
+            for article, scores in batch
+        ]
+        db.session.commit()
+        yield from responses
+
+    # noinspection PyMethodMayBeStatic
+    def _get_saved_validators(self, feed: Feed) -> tuple[str | None, str | None]:
+        """Return the HTTP validators of the feed as stored, not as changed in the session and left unflushed."""
+        with db.session.no_autoflush:
+            return tuple(
+                db.session.query(Feed.etag, Feed.last_modified)
+                .filter(Feed.id == feed.id)
+                .one()
+            )
+
+    # noinspection PyMethodMayBeStatic
+    def _get_processed_article_response(
+        self,
+        article: Article,
+        scored_labels: list[ScoredLabel],
+        scored_topics: list[ScoredTopic],
+    ) -> dict:
+        return {
+            "article": article.to_dict(),
+            "scored_topics": [st.to_dict() for st in scored_topics],
+            "scored_labels": [sl.to_dict() for sl in scored_labels],
+            "status": "processed and saved",
+        }
+
+    def run_fetch_job(self, job: IngestionJob, renew_lease: Callable[[], bool]) -> None:
+        """
+        Ingest the feeds of the job that did not succeed yet, recording the progress of each one as it finishes.
+        Raises an exception if any feed failed, so that the job gets retried for those feeds only.
+        """
+        job_feeds = {
+            job_feed.feed_id: job_feed
+            for job_feed in job.feeds
+            if job_feed.status != JobStatus.SUCCEEDED.name
+        }
+        feeds = Feed.query.filter(Feed.id.in_(job_feeds.keys())).all()
+        failed_feed_ids: list[int] = []
+        fetch_metrics: dict[int, FeedFetchMetric] = {}
+        for feed, articles in self.rss_service.fetch_all_articles(feeds, fetch_metrics):
+            job_feed = job_feeds[feed.id]
+            job_feed.status = JobStatus.RUNNING.name
+            job_feed.started = datetime.now(timezone.utc)
+            job_feed.article_fetch_count = len(articles)
+            job_feed.article_process_count = 0
+            job_feed.error = None
+            fetch_metric = fetch_metrics.get(feed.id)
+            try:
+                # Even when the feed could not be fetched, this saves its schedule and records its fetch metrics
+                for processed, _ in self.ingest_feed_articles(
+                    feed, articles, fetch_metric
+                ):
+                    job_feed.article_process_count += int(processed)
+                if fetch_metric is not None and fetch_metric.error is not None:
+                    job_feed.status = JobStatus.FAILED.name
+                    job_feed.error = fetch_metric.error
+                    failed_feed_ids.append(feed.id)
+                else:
+                    job_feed.status = JobStatus.SUCCEEDED.name
+            except Exception as e:
+                db.session.rollback()
+                job_feed.article_fetch_count = len(articles)
+                job_feed.status = JobStatus.FAILED.name
+                job_feed.error = repr(e)
+                failed_feed_ids.append(feed.id)
+                if fetch_metric is not None:
+                    fetch_metric.error = repr(e)
+                    self.fetch_metrics_service.record(fetch_metric)
+            job_feed.finished = datetime.now(timezone.utc)
+            db.session.commit()
+            if not renew_lease():
+                raise LeaseLostError(job.id)
+        if len(failed_feed_ids) > 0:
+            raise RuntimeError(f"Failed to ingest feeds {failed_feed_ids}")
@@ -0,0 +1,158 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Update, and_, or_, update
+
+from app.config import Config
+from app.db import db
+from app.models.ingestion_job import IngestionJob, IngestionJobFeed, JobStatus
+
+
+class JobService:
+    """Database-backed job queue: jobs are enqueued, claimed under a lease, and either completed or retried."""
+
+    lease_seconds: int
+    max_attempts: int
+    retry_backoff_seconds: int
+
+    def __init__(self, config: Config) -> None:
+        self.lease_seconds = int(config.get("jobs.lease-seconds", 300))
+        self.max_attempts = int(config.get("jobs.max-attempts", 3))
+        self.retry_backoff_seconds = int(config.get("jobs.retry-backoff-seconds", 60))
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Any = None,
+        feed_ids: list[int] | None = None,
+    ) -> IngestionJob:
+        now = datetime.now(timezone.utc)
+        job = IngestionJob(
+            kind=kind,
+            payload=None if payload is None else json.dumps(payload),
+            max_attempts=self.max_attempts,
+            created=now,
+            available_at=now,
+        )
+        job.feeds = [
+            IngestionJobFeed(job=job, feed_id=feed_id) for feed_id in feed_ids or []
+        ]
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def claim(self, worker_id: str) -> IngestionJob | None:
+        """
+        Take the lease on the oldest claimable job: a queued one that is due, or a running one whose lease expired.
+        The lease is taken with a conditional UPDATE, so that only one of several competing workers gets the job.
+        """
+        now = datetime.now(timezone.utc)
+        claimable = or_(
+            and_(
+                IngestionJob.status == JobStatus.QUEUED.name,
+                IngestionJob.available_at <= now,
+            ),
+            and_(
+                IngestionJob.status == JobStatus.RUNNING.name,
+                IngestionJob.lease_expires < now,
+            ),
+        )
+        candidate_ids = [
+            job_id
+            for (job_id,) in db.session.query(IngestionJob.id)
+            .filter(claimable)
+            .order_by(IngestionJob.available_at, IngestionJob.id)
+            .limit(10)
+            .all()
+        ]
+        for job_id in candidate_ids:
+            result = db.session.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id)
+                .where(claimable)
+                .values(
+                    status=JobStatus.RUNNING.name,
+                    attempts=IngestionJob.attempts + 1,
+                    lease_owner=worker_id,
+                    lease_expires=now + timedelta(seconds=self.lease_seconds),
+                    started=now,
+                    error=None,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            if result.rowcount == 1:
+                return db.session.get(IngestionJob, job_id, populate_existing=True)
+        return None
+
+    def renew_lease(self, job: IngestionJob, worker_id: str) -> bool:
+        """Extend the lease of a job still held by worker_id, returning False if it was lost to another worker."""
+        result = db.session.execute(
+            self._update_leased(job, worker_id).values(
+                lease_expires=datetime.now(timezone.utc)
+                + timedelta(seconds=self.lease_seconds)
+            )
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def complete(self, job: IngestionJob, worker_id: str) -> bool:
+        """Mark a job still held by worker_id as succeeded, returning False if the lease was lost to another worker."""
+        result = db.session.execute(
+            self._update_leased(job, worker_id).values(
+                status=JobStatus.SUCCEEDED.name,
+                finished=datetime.now(timezone.utc),
+                lease_owner=None,
+                lease_expires=None,
+            )
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def fail(self, job: IngestionJob, worker_id: str, error: str) -> bool:
+        """
+        Record the error of a job still held by worker_id and put it back in the queue with a backoff, unless it ran
+        out of attempts. Returns False if the lease was lost to another worker, the job being left alone then.
+        """
+        now = datetime.now(timezone.utc)
+        if job.attempts < job.max_attempts:
+            values = {
+                "status": JobStatus.QUEUED.name,
+                "available_at": now
+                + timedelta(
+                    seconds=self.retry_backoff_seconds * 2 ** (job.attempts - 1)
+                ),
+            }
+        else:
+            values = {"status": JobStatus.FAILED.name, "finished": now}
+        result = db.session.execute(
+            self._update_leased(job, worker_id).values(
+                error=error, lease_owner=None, lease_expires=None, **values
+            )
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def retry(self, job: IngestionJob) -> IngestionJob:
+        """Queue a finished job again, granting it a fresh set of attempts."""
+        job.status = JobStatus.QUEUED.name
+        job.attempts = 0
+        job.error = None
+        job.available_at = datetime.now(timezone.utc)
+        job.finished = None
+        db.session.commit()
+        return job
+
+    def get_payload(self, job: IngestionJob) -> Any:
+        return None if job.payload is None else json.loads(job.payload)
+
+    # noinspection PyMethodMayBeStatic
+    def _update_leased(self, job: IngestionJob, worker_id: str) -> Update:
+        return (
+            update(IngestionJob)
+            .where(IngestionJob.id == job.id)
+            .where(IngestionJob.lease_owner == worker_id)
+            .where(IngestionJob.status == JobStatus.RUNNING.name)
+            .execution_options(synchronize_session=False)
+        )
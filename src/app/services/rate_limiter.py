@@ -0,0 +1,34 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token buckets, one per key (say an endpoint URL), each refilled with rate tokens per second up to burst tokens.
+    Every call to acquire() takes a token, waiting for it if the bucket is empty: tokens are reserved in the order of
+    the calls, so that waiting callers are served first come, first served. A rate of 0 disables the limiter.
+    """
+
+    burst: int
+    rate: float
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.burst = max(1, burst)
+        self.rate = rate
+        # Tokens left in each bucket, negative when reserved ahead, and when they were counted
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> float:
+        """Take a token from the bucket of key, returning the seconds waited for it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            tokens, counted = self._buckets.get(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - counted) * self.rate) - 1
+            self._buckets[key] = (tokens, now)
+        delay = -tokens / self.rate if tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        return delay
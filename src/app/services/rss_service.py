@@ -1,45 +1,217 @@
+import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
+from email.utils import format_datetime
+from http import HTTPStatus
+from io import BytesIO
+from typing import Generator, NamedTuple
 
 import feedparser
-import requests
-from bs4 import BeautifulSoup
 from dateutil.parser import parse as parse_datetime
+from flask import current_app
 
-from app.config import Config
+from app.config import BASE_DIR, Config
+from app.db import db
+from app.exceptions.feed_fetch_error import FeedFetchError
 from app.models.article import Article
 from app.models.feed import Feed
+from app.models.feed_fetch_metric import FeedFetchMetric
+from app.services.content_cache import ContentCache
+from app.services.extraction_executor import ExtractionExecutor
+from app.services.feed_scheduler_service import FeedSchedulerService
+from app.services.http_client import HttpClient
+from app.services.soup_text_extractor import SoupTextExtractor
+from app.services.streaming_text_extractor import StreamingTextExtractor
+from app.services.text_extractor import TextExtractor
+
+
+class FullTextFetch(NamedTuple):
+    text: str | None
+    page_bytes: int
+    fetch_seconds: float
+    extraction_seconds: float
+    from_cache: bool
+    failed: bool
 
 
 class RSSService:
-    def __init__(self, config: Config) -> None:
-        pass
+    content_cache: ContentCache | None
+    extraction_executor: ExtractionExecutor
+    feed_deadline: float
+    feed_scheduler: FeedSchedulerService | None
+    feed_timeout: float
+    http_client: HttpClient
+    max_workers: int
+
+    def __init__(
+        self, config: Config, feed_scheduler: FeedSchedulerService | None = None
+    ) -> None:
+        self.feed_scheduler = feed_scheduler
+        # Socket timeout of the feed document, whereas the deadline bounds the whole fetch of a feed, pages included
+        self.feed_timeout = float(config.get("rss.feed-timeout", 30))
+        self.feed_deadline = float(config.get("rss.feed-deadline", 120))
+        self.max_workers = int(config.get("rss.max-workers", 8))
+        full_text_workers = int(config.get("rss.full-text-workers", 16))
+        self.http_client = HttpClient(
+            pool_size=full_text_workers,
+            max_per_host=int(config.get("rss.max-connections-per-host", 4)),
+            timeout=float(config.get("rss.page-timeout", 15)),
+            max_body_bytes=int(config.get("rss.max-page-bytes", 5 * 1024 * 1024)),
+        )
+        # Shared by every feed being fetched, so that it also caps the total number of page downloads in flight.
+        self._full_text_executor = ThreadPoolExecutor(
+            max_workers=full_text_workers, thread_name_prefix="rss-full-text"
+        )
+        engine = config.get("extraction.engine", "streaming")
+        max_chars = config.get("extraction.max-chars", 100000)
+        max_chars = None if max_chars is None else int(max_chars)
+        text_extractor: TextExtractor = {
+            "soup": SoupTextExtractor,
+            "streaming": StreamingTextExtractor,
+        }[engine](max_chars)
+        # Extracted in-process by default. On a multi-core machine ingesting many pages, set extraction.processes to
+        # about the number of cores for extraction to use them all, at the cost of spawning the workers on first use.
+        self.extraction_executor = ExtractionExecutor(
+            text_extractor, int(config.get("extraction.processes", 0))
+        )
+        content_cache_dir = config.get("content-cache.dir", None)
+        ttl = config.get("content-cache.ttl-seconds", None)
+        self.content_cache = (
+            ContentCache(
+                os.path.join(BASE_DIR, content_cache_dir),
+                max_bytes=int(config.get("content-cache.max-bytes", 256 * 1024 * 1024)),
+                ttl=None if ttl is None else float(ttl),
+            )
+            if content_cache_dir
+            else None
+        )
+        # Pages are cached along with their extracted text, which depends on how it is extracted
+        self._content_cache_key_prefix = f"{engine}:{max_chars}:"
+        self._seen_urls_lock = threading.Lock()
 
-    def fetch_articles(self, feed: Feed) -> list[Article]:
+    def fetch_all_articles(
+        self,
+        feeds: list[Feed],
+        fetch_metrics: dict[int, FeedFetchMetric] | None = None,
+    ) -> Generator[tuple[Feed, list[Article]], None, None]:
+        """
+        Fetch and parse the given feeds in a bounded thread pool, yielding each feed (attached to the current session)
+        with its articles as soon as it is ready, so the total time tracks the slowest feed rather than the sum of all.
+        The next poll of each feed gets scheduled from the outcome, left uncommitted along with the feed's validators.
+        If given, fetch_metrics receives the metrics of each feed's fetch, keyed by feed id, before the feed is yielded.
+        """
+        if len(feeds) == 0:
+            return
+        # Worker threads must not touch the consumer's session: detach the feeds so that commits done by the consumer
+        # do not expire them while they are being fetched, and re-attach each one once it is handed back.
+        for feed in feeds:
+            db.session.expunge(feed)
+        flask_app = current_app._get_current_object()  # type: ignore
+        seen_urls: set[str] = set()
+
+        def fetch_articles_in_app_context(
+            feed: Feed, fetch_metric: FeedFetchMetric
+        ) -> list[Article]:
+            # Each worker gets its own application context, hence its own session, for the known URLs lookup.
+            with flask_app.app_context():
+                return self.fetch_articles(feed, seen_urls, fetch_metric)
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(feeds)),
+            thread_name_prefix="rss-fetch",
+        ) as executor:
+            futures = {}
+            for feed in feeds:
+                fetch_metric = FeedFetchMetric(
+                    feed_id=feed.id, started=datetime.now(timezone.utc)
+                )
+                future = executor.submit(
+                    fetch_articles_in_app_context, feed, fetch_metric
+                )
+                futures[future] = (feed, fetch_metric)
+            for future in as_completed(futures):
+                articles: list[Article] = []
+                failed = False
+                feed, fetch_metric = futures[future]
+                try:
+                    articles = future.result()
+                except Exception as e:
+                    print(e, file=sys.stderr)  # TODO: Deal with error
+                    fetch_metric.error = repr(e)
+                    failed = True
+                feed = db.session.merge(feed)
+                if fetch_metrics is not None:
+                    fetch_metrics[feed.id] = fetch_metric
+                if self.feed_scheduler is not None:
+                    self.feed_scheduler.record_poll(feed, len(articles), failed)
+                yield feed, articles
+
+    def fetch_articles(
+        self,
+        feed: Feed,
+        seen_urls: set[str] | None = None,
+        fetch_metric: FeedFetchMetric | None = None,
+    ) -> list[Article]:
+        """
+        Fetch the entries of the feed published after its last fetch, skipping those whose URL is already stored or
+        in seen_urls (which gets the new URLs added), and download the full text of the remaining ones, until
+        feed_deadline seconds after the fetch started: the feed document not downloaded by then fails the fetch, and
+        the articles whose page is not downloaded by then are left without full text. The counts and durations of
+        each stage are recorded into fetch_metric, if given.
+        """
+        deadline = time.monotonic() + self.feed_deadline
+        started = datetime.now(timezone.utc)
+        if fetch_metric is None:
+            fetch_metric = FeedFetchMetric(feed_id=feed.id, started=started)
+        fetch_metric.started = started
         articles: list[Article] = []
-        parsed = feedparser.parse(feed.url, modified=feed.last_fetch)
-        if not hasattr(parsed, "status") or parsed.status < 200 or 300 <= parsed.status:
-            print(parsed, file=sys.stderr)  # TODO: Deal with error
+        parsed = self._fetch_feed(feed, fetch_metric, deadline)
+        status = getattr(parsed, "status", None)
+        fetch_metric.http_status = status
+        if status == HTTPStatus.NOT_MODIFIED:
+            pass  # Unchanged since the last poll: nothing to parse
+        elif status is None or status < 200 or 300 <= status:
+            raise FeedFetchError(feed.url, status, parsed.get("bozo_exception"))
         else:
+            selection_started = time.perf_counter()
+            fetch_metric.entry_count = len(parsed.entries)
+            new_entries = []
             for entry in parsed.entries:
                 try:
                     published = self._parse_published_date(entry)
                     if feed.last_fetch is None or published.astimezone(
                         timezone.utc
                     ) > feed.last_fetch.astimezone(timezone.utc):
-                        url = self._get_url(entry)
-                        articles.append(
-                            Article(
-                                feed_id=feed.id,
-                                url=url,
-                                title=entry.get("title"),
-                                summary=entry.get("summary"),
-                                full_text=self._get_full_text(url),
-                                published=published,
-                            )
+                        new_entries.append((entry, published))
+                except Exception as e:
+                    print(e, file=sys.stderr)  # TODO: Deal with error
+            new_urls = self._claim_new_urls(
+                [self._get_url(entry) for entry, _ in new_entries],
+                set() if seen_urls is None else seen_urls,
+            )
+            for entry, published in new_entries:
+                url = self._get_url(entry)
+                if url not in new_urls:
+                    continue
+                new_urls.discard(url)  # Repeated entries within the same feed
+                try:
+                    articles.append(
+                        Article(
+                            feed_id=feed.id,
+                            url=url,
+                            title=entry.get("title"),
+                            summary=entry.get("summary"),
+                            published=published,
                         )
+                    )
                 except Exception as e:
                     print(e, file=sys.stderr)  # TODO: Deal with error
+            fetch_metric.new_article_count = len(articles)
+            fetch_metric.parse_ms += self._get_elapsed_ms(selection_started)
+            self._add_full_texts(articles, fetch_metric, deadline)
         return sorted(
             articles,
             key=lambda article: article.published
@@ -47,15 +219,127 @@ class RSSService:
             else datetime.max,
         )
 
-    # noinspection PyMethodMayBeStatic
-    def _get_full_text(self, url: str) -> str | None:
+    def _claim_new_urls(self, urls: list[str], seen_urls: set[str]) -> set[str]:
+        """Return the URLs that are neither in seen_urls nor stored, checking the database with a single query."""
+        with self._seen_urls_lock:
+            new_urls = {url for url in urls if url is not None} - seen_urls
+            seen_urls.update(new_urls)
+        if len(new_urls) > 0:
+            stored_urls = (
+                db.session.query(Article.url).filter(Article.url.in_(new_urls)).all()
+            )
+            new_urls.difference_update(url for (url,) in stored_urls)
+        return new_urls
+
+    def _fetch_feed(
+        self, feed: Feed, fetch_metric: FeedFetchMetric, deadline: float
+    ) -> feedparser.FeedParserDict:
+        # The feed document is downloaded here rather than by feedparser so that it is bounded by a timeout.
+        headers = {}
+        if feed.etag:
+            headers["If-None-Match"] = feed.etag
+        if feed.last_modified:
+            headers["If-Modified-Since"] = feed.last_modified
+        elif feed.last_fetch is not None:
+            headers["If-Modified-Since"] = format_datetime(
+                feed.last_fetch.astimezone(timezone.utc), usegmt=True
+            )
+        download_started = time.perf_counter()
+        try:
+            http_response = self.http_client.get(
+                feed.url, headers=headers, timeout=self.feed_timeout, deadline=deadline
+            )
+        except Exception as e:
+            return feedparser.FeedParserDict(bozo=True, bozo_exception=e, entries=[])
+        finally:
+            fetch_metric.feed_fetch_ms = self._get_elapsed_ms(download_started)
+        fetch_metric.feed_bytes = len(http_response.content)
+        if http_response.status_code == HTTPStatus.NOT_MODIFIED:
+            return feedparser.FeedParserDict(
+                status=http_response.status_code, entries=[]
+            )
+        if http_response.ok:
+            feed.etag = http_response.headers.get("ETag")
+            feed.last_modified = http_response.headers.get("Last-Modified")
+        parse_started = time.perf_counter()
+        parsed = feedparser.parse(
+            BytesIO(http_response.content),
+            response_headers={
+                "content-location": http_response.url,
+                **{k.lower(): v for k, v in http_response.headers.items()},
+            },
+        )
+        parsed["status"] = http_response.status_code
+        fetch_metric.parse_ms = self._get_elapsed_ms(parse_started)
+        return parsed
+
+    def _add_full_texts(
+        self, articles: list[Article], fetch_metric: FeedFetchMetric, deadline: float
+    ) -> None:
+        futures = [
+            (article, self._full_text_executor.submit(self._get_full_text, article.url))
+            for article in articles
+        ]
+        fetch_seconds = 0.0
+        extraction_seconds = 0.0
+        for article, future in futures:
+            try:
+                full_text_fetch = future.result(
+                    timeout=max(0.0, deadline - time.monotonic())
+                )
+            except TimeoutError:
+                # Past the deadline, pages still queued are given up and those being downloaded are no longer waited for
+                future.cancel()
+                fetch_metric.page_count += 1
+                fetch_metric.page_error_count += 1
+                continue
+            article.full_text = full_text_fetch.text
+            fetch_metric.page_count += 1
+            fetch_metric.page_bytes += full_text_fetch.page_bytes
+            fetch_metric.page_cache_hit_count += int(full_text_fetch.from_cache)
+            fetch_metric.page_error_count += int(full_text_fetch.failed)
+            fetch_seconds += full_text_fetch.fetch_seconds
+            extraction_seconds += full_text_fetch.extraction_seconds
+        fetch_metric.page_fetch_ms += round(fetch_seconds * 1000)
+        fetch_metric.extraction_ms += round(extraction_seconds * 1000)
+
+    def _get_full_text(self, url: str) -> FullTextFetch:
         full_text = None
+        page_bytes = 0
+        fetch_seconds = 0.0
+        extraction_seconds = 0.0
+        from_cache = False
+        failed = False
         try:
-            http_response = requests.get(url)
-            full_text = BeautifulSoup(http_response.content, "html.parser").get_text()
+            # Pages downloaded earlier, say before a failed commit, are neither downloaded nor parsed again
+            cache_key = self._content_cache_key_prefix + url
+            cached = self.content_cache.get(cache_key) if self.content_cache else None
+            if cached is not None and cached.text is not None:
+                return FullTextFetch(cached.text, 0, 0.0, 0.0, True, False)
+            if cached is not None:
+                html, cacheable, from_cache = cached.html, True, True
+            else:
+                fetch_started = time.perf_counter()
+                http_response = self.http_client.get(url)
+                fetch_seconds = time.perf_counter() - fetch_started
+                html, cacheable = http_response.content, http_response.ok
+                page_bytes = len(html)
+                failed = not http_response.ok
+            extraction_started = time.perf_counter()
+            full_text = self.extraction_executor.extract(html)
+            extraction_seconds = time.perf_counter() - extraction_started
+            if self.content_cache is not None and cacheable:
+                self.content_cache.put(cache_key, html, full_text)
         except Exception as e:
             print(e, file=sys.stderr)  # TODO: Deal with error
-        return full_text
+            failed = True
+        return FullTextFetch(
+            full_text, page_bytes, fetch_seconds, extraction_seconds, from_cache, failed
+        )
+
+    # noinspection PyMethodMayBeStatic
+    def _get_elapsed_ms(self, started: float) -> int:
+        return round((time.perf_counter() - started) * 1000)
 
     # noinspection PyMethodMayBeStatic
     def _get_url(self, entry) -> str:
@@ -0,0 +1,157 @@
+import threading
+import time
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.db import db
+from app.models.label import Label, LabelHistory
+from app.models.topic import Topic, TopicHistory
+from app.models.topic_label import TopicLabel, TopicLabelHistory
+from app.services.topic_scoring_engine import TopicScoringEngine
+
+SCORING_MODEL_CHANGED_KEY = "_scoring_model_changed"
+SCORING_MODEL_CLASSES = (Label, TopicLabel, Topic)
+
+# Bumped on every committed change of a Label, TopicLabel or Topic, outdating the scoring models built before
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+class ScoringModel:
+    """
+    Snapshot of what scoring articles needs to know of the labels and topics, detached from any session: the labels
+    to classify, grouped by hypothesis, and the engine aggregating their scores into topic scores.
+    """
+
+    label_ids_by_strs: dict[str, dict[str, int]]
+    engine: TopicScoringEngine
+
+    def __init__(
+        self,
+        labels: list[tuple[int, str, str]],
+        topic_labels: list[tuple[int, int, float]],
+    ) -> None:
+        """Build the model from the id, text and hypothesis of each label, and the TopicLabels of these labels."""
+        self.label_ids_by_strs = {}
+        for label_id, text, hypothesis in labels:
+            self.label_ids_by_strs.setdefault(hypothesis, {})[text] = label_id
+        self.engine = TopicScoringEngine(
+            [label_id for label_id, _, _ in labels], topic_labels
+        )
+
+
+class ScoringModelCache:
+    """
+    Holds the ScoringModel of the labels of enabled TopicLabels and Topics, built on first use and rebuilt once any
+    Label, TopicLabel or Topic change has been committed, so that scoring articles does not query them every time.
+    Changes committed by this process are seen at once, those committed by other processes (workers, other instances
+    of the app) through the history of these models, checked at most every check_interval seconds.
+    """
+
+    check_interval: float
+
+    def __init__(self, check_interval: float = 30.0) -> None:
+        self.check_interval = check_interval
+        self._model: ScoringModel | None = None
+        self._model_generation = -1
+        self._model_version: tuple | None = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> ScoringModel:
+        with self._lock:
+            generation = _generation
+            if (
+                self._model is not None
+                and time.monotonic() - self._checked >= self.check_interval
+            ):
+                self._checked = time.monotonic()
+                if self._get_stored_version() != self._model_version:
+                    self._model = None
+            if self._model is None or self._model_generation != generation:
+                # Read before the model, so that a change committed meanwhile gets it rebuilt at the next check
+                self._model_version = self._get_stored_version()
+                self._model = self._build()
+                self._model_generation = generation
+                self._checked = time.monotonic()
+            return self._model
+
+    # noinspection PyMethodMayBeStatic
+    def _build(self) -> ScoringModel:
+        enabled_label_ids = (
+            select(TopicLabel.label_id)
+            .join(Topic)
+            .where(TopicLabel.enabled.is_(True))
+            .where(Topic.enabled.is_(True))
+        )
+        labels = (
+            db.session.query(Label.id, Label.text, Label.hypothesis)
+            .filter(Label.id.in_(enabled_label_ids))
+            .all()
+        )
+        topic_labels = (
+            db.session.query(
+                TopicLabel.label_id, TopicLabel.topic_id, TopicLabel.weight
+            )
+            .join(Topic)
+            .filter(TopicLabel.label_id.in_(enabled_label_ids))
+            .filter(TopicLabel.enabled.is_(True))
+            .filter(Topic.enabled.is_(True))
+            .all()
+        )
+        return ScoringModel(
+            [
+                (label_id, str(text), str(hypothesis))
+                for label_id, text, hypothesis in labels
+            ],
+            [
+                (label_id, topic_id, float(weight))
+                for label_id, topic_id, weight in topic_labels
+            ],
+        )
+
+    # noinspection PyMethodMayBeStatic
+    def _get_stored_version(self) -> tuple:
+        # Every committed change of a Label, TopicLabel or Topic adds a row to its history
+        return tuple(
+            db.session.query(
+                *(
+                    select(func.max(history_cls.id)).scalar_subquery()
+                    for history_cls in (LabelHistory, TopicLabelHistory, TopicHistory)
+                )
+            ).one()
+        )
+
+
+def invalidate_scoring_models() -> None:
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_scoring_model_changes(session: Session, flush_context) -> None:
+    if any(
+        isinstance(instance, SCORING_MODEL_CLASSES)
+        for instance in (*session.new, *session.dirty, *session.deleted)
+    ):
+        session.info[SCORING_MODEL_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_bulk_update")
+@event.listens_for(Session, "after_bulk_delete")
+def _flag_scoring_model_bulk_changes(context) -> None:
+    if issubclass(context.mapper.class_, SCORING_MODEL_CLASSES):
+        context.session.info[SCORING_MODEL_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_scoring_models(session: Session) -> None:
+    if session.info.pop(SCORING_MODEL_CHANGED_KEY, False):
+        invalidate_scoring_models()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_scoring_model_changes(session: Session, previous_transaction) -> None:
+    session.info.pop(SCORING_MODEL_CHANGED_KEY, None)
@@ -0,0 +1,240 @@
+from collections import defaultdict
+from typing import Callable
+
+from sqlalchemy import Float, delete, func, insert, select, tuple_, type_coerce, update
+
+from app.config import Config
+from app.db import db
+from app.exceptions.lease_lost_error import LeaseLostError
+from app.models.article import Article
+from app.models.ingestion_job import IngestionJob
+from app.models.mixins.audit import ChangeType, insert_bulk_history
+from app.models.scored_label import ScoredLabel
+from app.models.scored_topic import ScoredTopic
+from app.models.topic_label import TopicLabel
+from app.services.ai_service import AIService
+from app.services.job_service import JobService
+from app.services.scoring_model import ScoringModelCache
+
+
+class ScoringService:
+    """
+    Incremental scoring of the articles already saved: when labels get added to topics, the articles get scored
+    against the new labels only, and only the scores of the topics of these labels get updated. When only the weights
+    of topics' labels change, topic scores get recomputed from the stored label scores, without classifying anything.
+    """
+
+    SCORE_LABELS_JOB = "score-labels"
+
+    ai_service: AIService
+    batch_size: int
+    job_service: JobService
+    scoring_model_cache: ScoringModelCache
+
+    def __init__(
+        self, config: Config, ai_service: AIService, job_service: JobService
+    ) -> None:
+        self.ai_service = ai_service
+        # Number of articles whose missing scores are classified, then saved, at a time
+        self.batch_size = max(1, int(config.get("scoring.batch-size", 500)))
+        self.job_service = job_service
+        self.scoring_model_cache = ScoringModelCache(
+            float(config.get("scoring.model-check-interval", 30))
+        )
+
+    def enqueue_label_scoring(self, label_ids: list[int]) -> IngestionJob:
+        return self.job_service.enqueue(
+            self.SCORE_LABELS_JOB, payload={"label_ids": label_ids}
+        )
+
+    def run_score_labels_job(
+        self, job: IngestionJob, renew_lease: Callable[[], bool]
+    ) -> None:
+        label_ids = self.job_service.get_payload(job)["label_ids"]
+
+        def check_lease() -> None:
+            if not renew_lease():
+                raise LeaseLostError(job.id)
+
+        self.score_missing_labels(label_ids, check_lease)
+
+    def score_missing_labels(
+        self, label_ids: list[int], on_batch_saved: Callable[[], None] | None = None
+    ) -> int:
+        """
+        Score the articles that have no score yet for some of the labels, against these labels only, batch_size
+        articles at a time, then update the scores of the topics of these labels. Labels not part of an enabled topic
+        are skipped. on_batch_saved, if given, is called after each batch is committed. Returns the number of label
+        scores added.
+        """
+        scoring_model = self.scoring_model_cache.get()
+        label_ids = [
+            label_id
+            for label_id in label_ids
+            if label_id in scoring_model.engine.label_indexes
+        ]
+        if len(label_ids) == 0:
+            return 0
+        added_count = 0
+        last_article_id = 0
+        while True:
+            articles: list[Article] = (
+                Article.query.filter(Article.id > last_article_id)
+                .order_by(Article.id)
+                .limit(self.batch_size)
+                .all()
+            )
+            if len(articles) == 0:
+                break
+            last_article_id = articles[-1].id
+            added_count += self._score_batch(articles, label_ids)
+            db.session.commit()
+            if on_batch_saved is not None:
+                on_batch_saved()
+        return added_count
+
+    def _score_batch(self, articles: list[Article], label_ids: list[int]) -> int:
+        scored_pairs = set(
+            db.session.query(ScoredLabel.article_id, ScoredLabel.label_id)
+            .filter(ScoredLabel.article_id.in_([article.id for article in articles]))
+            .filter(ScoredLabel.label_id.in_(label_ids))
+            .all()
+        )
+        # Articles missing the same labels are classified together, against these labels only
+        articles_by_missing: dict[tuple[int, ...], list[Article]] = defaultdict(list)
+        for article in articles:
+            missing = tuple(
+                label_id
+                for label_id in label_ids
+                if (article.id, label_id) not in scored_pairs
+            )
+            if len(missing) > 0:
+                articles_by_missing[missing].append(article)
+        if len(articles_by_missing) == 0:
+            return 0
+        added_count = 0
+        with db.session.no_autoflush:
+            for missing, missing_articles in articles_by_missing.items():
+                for scored_labels in self.ai_service.add_label_scores_batch(
+                    missing_articles, list(missing)
+                ):
+                    db.session.add_all(scored_labels)
+                    added_count += len(scored_labels)
+        db.session.flush()
+        topic_ids = [
+            topic_id
+            for (topic_id,) in db.session.query(TopicLabel.topic_id)
+            .filter(TopicLabel.label_id.in_(label_ids))
+            .distinct()
+        ]
+        self.recompute_topic_scores(
+            topic_ids,
+            [
+                article.id
+                for missing_articles in articles_by_missing.values()
+                for article in missing_articles
+            ],
+        )
+        return added_count
+
+    def recompute_topic_scores(
+        self, topic_ids: list[int], article_ids: list[int] | None = None
+    ) -> int:
+        """
+        Rebuild the scores of the topics, for all the articles or only the given ones, from the stored label scores
+        and the weights of the enabled TopicLabels, without classifying anything. Manually set scores are left alone,
+        and the scores of articles left without any scored label in a topic are removed. The new scores are computed
+        by a single aggregate query, then only the changed ones are written, with bulk statements. Returns the number
+        of scores changed, to be committed by the caller.
+        """
+        if len(topic_ids) == 0:
+            return 0
+        weight_sum = func.sum(TopicLabel.weight)
+        # Topics whose scored labels all weigh 0 score 0, as in TopicScoringEngine
+        score = func.coalesce(
+            func.sum(ScoredLabel.score * TopicLabel.weight)
+            / func.nullif(weight_sum, 0),
+            0,
+        )
+        new_scores_query = (
+            select(
+                ScoredLabel.article_id, TopicLabel.topic_id, type_coerce(score, Float)
+            )
+            .join(TopicLabel, TopicLabel.label_id == ScoredLabel.label_id)
+            .where(TopicLabel.topic_id.in_(topic_ids))
+            .where(TopicLabel.enabled.is_(True))
+            .group_by(ScoredLabel.article_id, TopicLabel.topic_id)
+        )
+        scored_topics_query = select(
+            ScoredTopic.article_id,
+            ScoredTopic.topic_id,
+            ScoredTopic.score,
+            ScoredTopic.manually_set,
+            ScoredTopic.notes,
+        ).where(ScoredTopic.topic_id.in_(topic_ids))
+        if article_ids is not None:
+            new_scores_query = new_scores_query.where(
+                ScoredLabel.article_id.in_(article_ids)
+            )
+            scored_topics_query = scored_topics_query.where(
+                ScoredTopic.article_id.in_(article_ids)
+            )
+        new_scores: dict[tuple[int, int], float] = {
+            (article_id, topic_id): new_score
+            for article_id, topic_id, new_score in db.session.execute(new_scores_query)
+        }
+        updated: list[dict] = []
+        deleted: list[dict] = []
+        for article_id, topic_id, old_score, manually_set, notes in db.session.execute(
+            scored_topics_query
+        ):
+            new_score = new_scores.pop((article_id, topic_id), None)
+            row = {
+                "article_id": article_id,
+                "topic_id": topic_id,
+                "score": old_score,
+                "manually_set": manually_set,
+                "notes": notes,
+            }
+            if manually_set:
+                continue
+            elif new_score is None:
+                deleted.append(row)
+            # Within the precision of the score column
+            elif abs(float(old_score) - new_score) >= 1e-10:
+                updated.append({**row, "score": new_score})
+        inserted = [
+            {
+                "article_id": article_id,
+                "topic_id": topic_id,
+                "score": new_score,
+                "manually_set": False,
+                "notes": None,
+            }
+            for (article_id, topic_id), new_score in new_scores.items()
+        ]
+        if len(inserted) > 0:
+            db.session.execute(insert(ScoredTopic), inserted)
+        if len(updated) > 0:
+            db.session.execute(
+                update(ScoredTopic),
+                [
+                    {key: row[key] for key in ("article_id", "topic_id", "score")}
+                    for row in updated
+                ],
+            )
+        for start in range(0, len(deleted), 500):
+            db.session.execute(
+                delete(ScoredTopic).where(
+                    tuple_(ScoredTopic.article_id, ScoredTopic.topic_id).in_(
+                        [
+                            (row["article_id"], row["topic_id"])
+                            for row in deleted[start : start + 500]
+                        ]
+                    )
+                )
+            )
+        insert_bulk_history(db.session, ScoredTopic, inserted, ChangeType.CREATE)
+        insert_bulk_history(db.session, ScoredTopic, updated, ChangeType.UPDATE)
+        insert_bulk_history(db.session, ScoredTopic, deleted, ChangeType.DELETE)
+        return len(inserted) + len(updated) + len(deleted)
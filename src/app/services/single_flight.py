@@ -0,0 +1,36 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call with a given key is in flight, the other calls with the same
+    key wait for it and share its result, or its exception, instead of running again.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key, None)
+            leading = future is None
+            if leading:
+                future = Future()
+                self._calls[key] = future
+        if not leading:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,21 @@
+from bs4 import BeautifulSoup
+
+from app.services.text_extractor import TextExtractor
+
+
+class SoupTextExtractor(TextExtractor):
+    """Builds the whole BeautifulSoup tree of the page, then removes the skipped and boilerplate elements from it."""
+
+    parser: str
+
+    def __init__(
+        self, max_chars: int | None = None, parser: str = "html.parser"
+    ) -> None:
+        super().__init__(max_chars)
+        self.parser = parser
+
+    def extract(self, html: bytes) -> str:
+        soup = BeautifulSoup(html, self.parser)
+        for element in soup.find_all(self.SKIPPED_TAGS | self.BOILERPLATE_TAGS):
+            element.decompose()
+        return self._clean_up(soup.get_text("\n"))
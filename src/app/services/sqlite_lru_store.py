@@ -0,0 +1,153 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, TypeVar
+
+V = TypeVar("V")
+
+
+class SQLiteLRUStore(Generic[V]):
+    """
+    Key-value store kept in memory up to max_entries, the least recently used entries being evicted beyond. If given a
+    path, entries are also stored in a table of an SQLite database there, so that they survive restarts and are shared
+    between processes, the least recently used rows being deleted once the table holds more than max_stored_entries.
+    Values are stored in a column of the given SQLite type, as returned by encode, and read back through decode.
+    """
+
+    max_entries: int
+    max_stored_entries: int
+    path: str | None
+    table: str
+
+    def __init__(
+        self,
+        table: str,
+        column_type: str,
+        max_entries: int,
+        path: str | None = None,
+        max_stored_entries: int = 1000000,
+        encode: Callable[[V], Any] | None = None,
+        decode: Callable[[Any], V] | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_stored_entries = max_stored_entries
+        self.path = path
+        self.table = table
+        self._encode = encode or (lambda value: value)
+        self._decode = decode or (lambda stored: stored)
+        self._entries: OrderedDict[str, V] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        # Upper bound of the number of rows stored, counted exactly only once it exceeds max_stored_entries
+        self._stored_count = 0
+        if path is not None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            columns = [
+                row[1]
+                for row in self._connection.execute(f"PRAGMA table_info({table})")
+            ]
+            if len(columns) > 0 and columns != ["key", "value", "used"]:
+                # Stored by a previous version, without the last use of the rows: being a cache, it is started over
+                self._connection.execute(f"DROP TABLE {table}")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                f"(key TEXT PRIMARY KEY, value {column_type} NOT NULL, used REAL NOT NULL)"
+            )
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_used ON {table} (used)"
+            )
+            self._connection.commit()
+            self._stored_count = self._connection.execute(
+                f"SELECT COUNT(*) FROM {table}"
+            ).fetchone()[0]
+
+    def __len__(self) -> int:
+        """Return the number of entries kept in memory."""
+        with self._lock:
+            return len(self._entries)
+
+    def get_many(self, keys: list[str]) -> dict[str, V]:
+        """Return the stored values of the given keys, leaving out the keys that are not stored."""
+        values: dict[str, V] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    values[key] = self._entries[key]
+        missing_keys = [key for key in keys if key not in values]
+        if self._connection is not None and len(missing_keys) > 0:
+            stored = self._read_stored(missing_keys)
+            self._remember(stored)
+            values.update(stored)
+        return values
+
+    def put_many(self, values: dict[str, V]) -> None:
+        self._remember(values)
+        if self._connection is None or len(values) == 0:
+            return
+        used = time.time()
+        try:
+            with self._lock:
+                self._connection.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, used) VALUES (?, ?, ?)",
+                    [(key, self._encode(value), used) for key, value in values.items()],
+                )
+                self._stored_count += len(values)
+                if self._stored_count > self.max_stored_entries:
+                    self._evict_stored()
+                self._connection.commit()
+        except sqlite3.Error as e:
+            print(e, file=sys.stderr)  # TODO: Deal with error
+
+    def _evict_stored(self) -> None:
+        self._stored_count = self._connection.execute(
+            f"SELECT COUNT(*) FROM {self.table}"
+        ).fetchone()[0]
+        if self._stored_count <= self.max_stored_entries:
+            return
+        # Down to 90% of the limit, so that a full store does not evict on every put
+        evicted_count = self._stored_count - int(self.max_stored_entries * 0.9)
+        self._connection.execute(
+            f"DELETE FROM {self.table} WHERE key IN "
+            f"(SELECT key FROM {self.table} ORDER BY used LIMIT ?)",
+            (evicted_count,),
+        )
+        self._stored_count -= evicted_count
+
+    def _read_stored(self, keys: list[str]) -> dict[str, V]:
+        stored: dict[str, V] = {}
+        try:
+            with self._lock:
+                # Within SQLite's default limit of 999 parameters per statement
+                for start in range(0, len(keys), 900):
+                    chunk = keys[start : start + 900]
+                    placeholders = ", ".join("?" * len(chunk))
+                    for key, value in self._connection.execute(
+                        f"SELECT key, value FROM {self.table} WHERE key IN ({placeholders})",
+                        chunk,
+                    ):
+                        stored[key] = self._decode(value)
+                    # Rows read count as used, for the eviction of the least recently used ones
+                    self._connection.execute(
+                        f"UPDATE {self.table} SET used = ? WHERE key IN ({placeholders})",
+                        [time.time(), *chunk],
+                    )
+                self._connection.commit()
+        except sqlite3.Error as e:
+            print(e, file=sys.stderr)  # TODO: Deal with error
+        return stored
+
+    def _remember(self, values: dict[str, V]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
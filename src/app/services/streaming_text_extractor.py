@@ -0,0 +1,104 @@
+import codecs
+from html.parser import HTMLParser
+
+from app.services.text_extractor import TextExtractor
+
+
+class _BudgetReached(Exception):
+    pass
+
+
+class _TextCollector(HTMLParser):
+    # Elements whose boundaries are line breaks in the text
+    BLOCK_TAGS = frozenset(
+        {
+            "address",
+            "article",
+            "blockquote",
+            "br",
+            "dd",
+            "div",
+            "dl",
+            "dt",
+            "figcaption",
+            "h1",
+            "h2",
+            "h3",
+            "h4",
+            "h5",
+            "h6",
+            "hr",
+            "li",
+            "main",
+            "ol",
+            "p",
+            "pre",
+            "section",
+            "table",
+            "td",
+            "th",
+            "tr",
+            "ul",
+        }
+    )
+
+    def __init__(self, dropped_tags: frozenset[str], max_chars: int | None) -> None:
+        super().__init__()
+        self.char_count = 0
+        self.chunks: list[str] = []
+        self.dropped_tags = dropped_tags
+        self.max_chars = max_chars
+        self.open_dropped_tags: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in self.dropped_tags:
+            self.open_dropped_tags.append(tag)
+        elif tag in self.BLOCK_TAGS:
+            self.chunks.append("\n")
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        if tag in self.BLOCK_TAGS:
+            self.chunks.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.open_dropped_tags:
+            # Also closes the dropped elements left open inside it
+            while self.open_dropped_tags.pop() != tag:
+                pass
+        elif tag in self.BLOCK_TAGS:
+            self.chunks.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if len(self.open_dropped_tags) > 0:
+            return
+        self.chunks.append(data)
+        # Counted without the spaces, which may collapse, so that the text left after the clean-up fills the budget
+        self.char_count += len(data) - data.count(" ")
+        if self.max_chars is not None and self.char_count >= self.max_chars:
+            raise _BudgetReached()
+
+
+class StreamingTextExtractor(TextExtractor):
+    """
+    Single pass over the page with the standard library's HTMLParser, fed chunk by chunk without building a tree.
+    Skipped and boilerplate elements are dropped as they stream by, and parsing stops once max_chars are collected,
+    leaving the rest of the page undecoded.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def extract(self, html: bytes) -> str:
+        collector = _TextCollector(
+            self.SKIPPED_TAGS | self.BOILERPLATE_TAGS, self.max_chars
+        )
+        decoder = codecs.getincrementaldecoder(self._detect_encoding(html))(
+            errors="replace"
+        )
+        try:
+            for start in range(0, len(html), self.CHUNK_SIZE):
+                collector.feed(decoder.decode(html[start : start + self.CHUNK_SIZE]))
+            collector.feed(decoder.decode(b"", final=True))
+            collector.close()
+        except _BudgetReached:
+            pass
+        return self._clean_up("".join(collector.chunks))
@@ -0,0 +1,55 @@
+import hashlib
+import threading
+
+from app.services.sqlite_lru_store import SQLiteLRUStore
+
+
+class SummaryCache(SQLiteLRUStore[str]):
+    """
+    Content-addressed cache of generated summaries, keyed by the model and the normalized text summarized, so that
+    articles with identical bodies, say syndicated in several feeds, get summarized once. Summaries are kept in memory
+    up to max_entries and, if given a path, in an SQLite database up to max_stored_entries. Counts the hits and misses
+    of get().
+    """
+
+    hits: int
+    misses: int
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        path: str | None = None,
+        max_stored_entries: int = 100000,
+    ) -> None:
+        super().__init__("summaries", "TEXT", max_entries, path, max_stored_entries)
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def get_key(model: str, text: str) -> str:
+        # Whitespace differences, say between feeds rendering the same body, do not make a different text
+        normalized = " ".join(text.split())
+        return hashlib.sha256(f"{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        summary = self.get_many([key]).get(key, None)
+        with self._stats_lock:
+            if summary is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return summary
+
+    def put(self, key: str, summary: str) -> None:
+        self.put_many({key: summary})
+
+    def get_stats(self) -> dict[str, int | float]:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups > 0 else 0.0,
+                "entries": len(self),
+            }
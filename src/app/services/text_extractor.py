@@ -0,0 +1,52 @@
+import codecs
+from abc import ABC, abstractmethod
+
+from bs4.dammit import EncodingDetector
+
+
+class TextExtractor(ABC):
+    """Extraction of the readable text of an HTML page, cut to max_chars characters if set."""
+
+    # Elements whose content is never part of the readable text of a page
+    SKIPPED_TAGS = frozenset(
+        {"script", "style", "noscript", "template", "svg", "canvas", "iframe"}
+    )
+    # Page furniture around the text itself
+    BOILERPLATE_TAGS = frozenset(
+        {
+            "title",
+            "nav",
+            "header",
+            "footer",
+            "aside",
+            "form",
+            "button",
+            "select",
+            "menu",
+        }
+    )
+
+    max_chars: int | None
+
+    def __init__(self, max_chars: int | None = None) -> None:
+        self.max_chars = max_chars
+
+    @abstractmethod
+    def extract(self, html: bytes) -> str:
+        pass
+
+    # noinspection PyMethodMayBeStatic
+    def _detect_encoding(self, html: bytes) -> str:
+        if html.startswith(codecs.BOM_UTF8):
+            return "utf-8-sig"
+        encoding = EncodingDetector.find_declared_encoding(html[:8192], is_html=True)
+        try:
+            return codecs.lookup(encoding).name if encoding else "utf-8"
+        except LookupError:
+            return "utf-8"
+
+    def _clean_up(self, text: str) -> str:
+        """Collapse the whitespace within lines and drop the blank ones, then cut the text to max_chars."""
+        lines = (" ".join(line.split()) for line in text.splitlines())
+        text = "\n".join(line for line in lines if line)
+        return text if self.max_chars is None else text[: self.max_chars]
@@ -0,0 +1,52 @@
+import numpy as np
+
+
+class TopicScoringEngine:
+    """
+    Aggregates label scores into topic scores with a label x topic weight matrix, the score of a topic being the
+    weighted mean of the scores of its labels. Scores of any number of articles are computed at once as matrix
+    products, from an article x label matrix of scores and a mask of the labels actually scored, labels left unscored
+    (say their classification failed) counting neither in the score nor in the scale of their topics.
+    """
+
+    label_ids: list[int]
+    topic_ids: list[int]
+    label_indexes: dict[int, int]
+    weights: np.ndarray
+    links: np.ndarray
+
+    def __init__(
+        self, label_ids: list[int], topic_labels: list[tuple[int, int, float]]
+    ) -> None:
+        """Build the matrix of the given labels, from the label id, topic id and weight of each of their TopicLabels."""
+        self.label_ids = label_ids
+        self.label_indexes = {
+            label_id: index for index, label_id in enumerate(self.label_ids)
+        }
+        topic_indexes: dict[int, int] = {}
+        entries: list[tuple[int, int, float]] = []
+        for label_id, topic_id, weight in topic_labels:
+            topic_index = topic_indexes.setdefault(topic_id, len(topic_indexes))
+            entries.append((self.label_indexes[label_id], topic_index, weight))
+        self.topic_ids = list(topic_indexes.keys())
+        self.weights = np.zeros((len(label_ids), len(self.topic_ids)))
+        # Whether a label belongs to a topic, even with a weight of 0
+        self.links = np.zeros((len(label_ids), len(self.topic_ids)))
+        for label_index, topic_index, weight in entries:
+            self.weights[label_index, topic_index] = weight
+            self.links[label_index, topic_index] = 1.0
+
+    def get_topic_scores(
+        self, label_scores: np.ndarray, scored: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the article x topic matrix of topic scores, and the mask of the topics with at least one label scored,
+        given the article x label matrix of label scores, 0 where not scored, and the mask of the labels scored.
+        """
+        scored = scored.astype(np.float64)
+        scales = scored @ self.weights
+        # Topics whose scored labels all weigh 0 score 0, rather than dividing by 0
+        scales[scales == 0.0] = 1.0
+        return (label_scores * scored) @ self.weights / scales, (
+            scored @ self.links
+        ) > 0.0
@@ -2,7 +2,12 @@ from typing import Protocol
 
 from app.services.ai_service import AIService
 from app.services.auth_service import AuthService
+from app.services.feed_scheduler_service import FeedSchedulerService
+from app.services.fetch_metrics_service import FetchMetricsService
+from app.services.ingestion_service import IngestionService
+from app.services.job_service import JobService
 from app.services.rss_service import RSSService
+from app.services.scoring_service import ScoringService
 from app.services.article_service import ArticleService
 
 
@@ -10,4 +15,9 @@ class FlaskWithServices(Protocol):
     ai_service: AIService
     article_service: ArticleService
     auth_service: AuthService
+    feed_scheduler_service: FeedSchedulerService
+    fetch_metrics_service: FetchMetricsService
+    ingestion_service: IngestionService
+    job_service: JobService
     rss_service: RSSService
+    scoring_service: ScoringService
@@ -0,0 +1,89 @@
+import os
+import socket
+import sys
+import time
+from typing import Callable
+
+from flask import g
+
+from app.db import db
+from app.exceptions.lease_lost_error import LeaseLostError
+from app.models.ingestion_job import IngestionJob
+from app.services.ingestion_service import IngestionService
+from app.services.scoring_model import invalidate_scoring_models
+from app.services.scoring_service import ScoringService
+from app.typing import FlaskWithServices
+
+
+class IngestionWorker:
+    """
+    Background worker that claims ingestion jobs from the queue and runs them. Several worker processes can share a
+    queue: each job is leased to a single worker at a time.
+    """
+
+    app: FlaskWithServices
+    poll_interval: float
+    schedule: bool
+    worker_id: str
+
+    def __init__(
+        self,
+        app: FlaskWithServices,
+        worker_id: str | None = None,
+        poll_interval: float = 5.0,
+        schedule: bool = False,
+    ) -> None:
+        self.app = app
+        self.poll_interval = poll_interval
+        self.schedule = schedule
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+    def get_handlers(
+        self,
+    ) -> dict[str, Callable[[IngestionJob, Callable[[], bool]], None]]:
+        return {
+            IngestionService.FETCH_FEEDS_JOB: self.app.ingestion_service.run_fetch_job,
+            ScoringService.SCORE_LABELS_JOB: self.app.scoring_service.run_score_labels_job,
+        }
+
+    def run(self, once: bool = False) -> None:
+        """Process jobs until interrupted or, if once is set, until the queue has no claimable job left."""
+        g.audit_user_id = f"worker:{self.worker_id}"
+        while True:
+            if self.schedule:
+                self.schedule_due_feeds()
+            if not self.run_next():
+                if once:
+                    break
+                time.sleep(self.poll_interval)
+
+    def schedule_due_feeds(self) -> IngestionJob | None:
+        """Queue a fetch job for the feeds whose next poll is due, if any."""
+        feed_ids = [feed.id for feed in self.app.feed_scheduler_service.get_due_feeds()]
+        if len(feed_ids) == 0:
+            return None
+        return self.app.job_service.enqueue(
+            IngestionService.FETCH_FEEDS_JOB, feed_ids=feed_ids
+        )
+
+    def run_next(self) -> bool:
+        """Claim and run a single job, returning False if there was none to claim."""
+        job_service = self.app.job_service
+        job = job_service.claim(self.worker_id)
+        if job is None:
+            return False
+        # Labels and topics may have been changed by other processes since the last job
+        invalidate_scoring_models()
+        try:
+            handler = self.get_handlers()[job.kind]
+            handler(job, lambda: job_service.renew_lease(job, self.worker_id))
+            job_service.complete(job, self.worker_id)
+        except LeaseLostError as e:
+            # The job is another worker's now, which will finish it
+            print(e, file=sys.stderr)  # TODO: Deal with error
+            db.session.rollback()
+        except Exception as e:
+            print(e, file=sys.stderr)  # TODO: Deal with error
+            db.session.rollback()
+            job_service.fail(job, self.worker_id, repr(e))
+        return True
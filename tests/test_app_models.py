@@ -4,6 +4,7 @@ from datetime import datetime, timezone
 from typing import Callable, Generator, TypeVar, cast
 
 import pytest
+from ariadne import graphql_sync
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 
@@ -11,13 +12,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 from app import create_app
 from app.db import db
-from app.models.article import Article
+from app.models.article import Article, ArticleHistory
 from app.models.feed import Feed
 from app.models.label import Label
 from app.models.scored_topic import ScoredTopic
 from app.models.scored_label import ScoredLabel
 from app.models.tag import Tag
 from app.models.topic import Topic
+from app.routes.graphql.ariadne import schema
 
 _E = TypeVar("_E")
 _R = TypeVar("_R")
@@ -131,6 +133,51 @@ def test_article(my_db: SQLAlchemy, article_id, num_scored_topics, num_scored_la
     )
 
 
+def test_article_texts_are_stored_compressed(my_db: SQLAlchemy):
+    full_text = "Full text of the article. " * 1000
+    a = my_db.session.get(Article, 1)
+    a.full_text = full_text
+    a.ai_summary = "AI summary"
+    my_db.session.commit()
+    my_db.session.expunge_all()
+
+    stored_length, stored_type = my_db.session.execute(
+        my_db.text(
+            "SELECT length(full_text), typeof(full_text) FROM articles WHERE id = 1"
+        )
+    ).one()
+    a = my_db.session.get(Article, 1)
+
+    assert stored_type == "blob" and stored_length < len(full_text) / 10
+    assert "full_text" not in a.__dict__  # Deferred until accessed
+    assert a.full_text == full_text
+    assert a.ai_summary == "AI summary"
+    assert [h.full_text for h in ArticleHistory.query.order_by(ArticleHistory.id)] == [
+        None,
+        None,
+        full_text,
+    ]
+
+
+def test_compressed_texts_are_only_filtered_on_by_equality(my_db: SQLAlchemy):
+    a = my_db.session.get(Article, 1)
+    a.ai_summary = "AI summary"
+    my_db.session.commit()
+
+    def query(article_filter: str) -> tuple[bool, dict]:
+        return graphql_sync(
+            schema,
+            {"query": f"{{ articles(filter: {article_filter}) {{ id }} }}"},
+            context_value={"session": my_db.session},
+        )
+
+    success, result = query('{ai_summary: "AI summary"}')
+    assert success and result["data"]["articles"] == [{"id": 1}]
+    assert query('{title__contains: "TA"}')[0]
+    assert not query('{ai_summary__contains: "AI"}')[0]
+    assert not query('{full_text__like: "%AI%"}')[0]
+
+
 def assert_rel_collection_belongs_to_entity(
     entity_rel_collection: list, length: int, get_id: Callable[[_E], _R], id_value: _R
 ):
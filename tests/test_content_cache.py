@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app.services.content_cache import ContentCache
+
+
+def test_content_cache_round_trip_and_ttl(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    cache = ContentCache(str(tmp_path), ttl=60)
+    html = b"<html><body>" + b"Hello " * 1000 + b"</body></html>"
+
+    assert cache.get("https://localhost/a1") is None
+    cache.put("https://localhost/a1", html, "Hello")
+    cache.put("https://localhost/a2", html, None)
+
+    cached = cache.get("https://localhost/a1")
+    assert cached is not None and (cached.html, cached.text) == (html, "Hello")
+    assert cache.get("https://localhost/a2").text is None
+    assert sum(len(files) for _, _, files in os.walk(tmp_path)) == 2
+    assert cache._total_bytes < len(html)
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("https://localhost/a1") is None
+    assert sum(len(files) for _, _, files in os.walk(tmp_path)) == 1
+
+
+def test_content_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = ContentCache(str(tmp_path), max_bytes=3500, compression_level=0)
+    for i in range(3):
+        cache.put(f"https://localhost/a{i}", bytes(1000), None)
+        # Spread the modification times, which have a coarse resolution on some file systems
+        os.utime(cache._get_path(f"https://localhost/a{i}"), (i, i))
+    os.utime(cache._get_path("https://localhost/a0"), (10, 10))
+
+    cache.put("https://localhost/a3", bytes(1000), None)
+
+    assert cache.get("https://localhost/a0") is not None
+    assert cache.get("https://localhost/a1") is None
+    assert cache.get("https://localhost/a2") is not None
+    assert cache.get("https://localhost/a3") is not None
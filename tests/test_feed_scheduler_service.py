@@ -0,0 +1,76 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Generator, cast
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app import create_app
+from app.db import db
+from app.models.feed import Feed
+from app.models.feed_schedule import FeedSchedule
+from app.services.feed_scheduler_service import FeedSchedulerService
+from app.typing import FlaskWithServices
+
+
+@pytest.fixture()
+def scheduler() -> Generator[FeedSchedulerService]:
+    my_app = cast(Flask, create_app("testing"))
+    with my_app.app_context():
+        db.create_all()
+        db.session.add_all(
+            [
+                Feed(id=1, name="Busy Feed", url="https://localhost/f1"),
+                Feed(id=2, name="Quiet Feed", url="https://localhost/f2"),
+                Feed(
+                    id=3,
+                    name="Disabled Feed",
+                    url="https://localhost/f3",
+                    enabled=False,
+                ),
+            ]
+        )
+        db.session.commit()
+        scheduler = cast(FlaskWithServices, my_app).feed_scheduler_service
+        scheduler.default_poll_interval = 3600
+        scheduler.min_poll_interval = 60
+        scheduler.max_poll_interval = 86400
+        scheduler.backoff_factor = 2
+        yield scheduler
+        db.session.remove()
+        db.drop_all()
+
+
+def test_poll_interval_adapts_to_the_feed_activity(scheduler: FeedSchedulerService):
+    busy, quiet = db.session.get(Feed, 1), db.session.get(Feed, 2)
+
+    assert scheduler.record_poll(busy, 5).poll_interval == 1800
+    assert scheduler.record_poll(busy, 3).poll_interval == 900
+    assert scheduler.record_poll(quiet, 0).poll_interval == 7200
+
+    failing = scheduler.record_poll(busy, 0, failed=True)
+    assert failing.poll_interval == 900
+    assert failing.consecutive_failures == 1
+    failing = scheduler.record_poll(busy, 0, failed=True)
+    assert failing.next_poll - failing.last_poll == timedelta(seconds=3600)
+
+    recovered = scheduler.record_poll(busy, 1)
+    assert recovered.consecutive_failures == 0
+    assert recovered.poll_interval == 450
+
+
+def test_due_feeds_skip_disabled_and_not_yet_due_feeds(
+    scheduler: FeedSchedulerService,
+):
+    assert [feed.id for feed in scheduler.get_due_feeds()] == [1, 2]
+
+    scheduler.record_poll(db.session.get(Feed, 1), 1)
+    db.session.commit()
+    assert [feed.id for feed in scheduler.get_due_feeds()] == [2]
+
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    assert [feed.id for feed in scheduler.get_due_feeds(later)] == [2, 1]
+    assert db.session.get(FeedSchedule, 3) is None
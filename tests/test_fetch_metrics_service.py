@@ -0,0 +1,78 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Generator, cast
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app import create_app
+from app.db import db
+from app.models.feed import Feed
+from app.models.feed_fetch_metric import FeedFetchMetric
+from app.typing import FlaskWithServices
+
+
+@pytest.fixture()
+def my_app() -> Generator[FlaskWithServices]:
+    my_app = cast(Flask, create_app("testing"))
+    with my_app.app_context():
+        db.create_all()
+        db.session.add(Feed(id=1, name="Fast Feed", url="https://localhost/f1"))
+        db.session.add(Feed(id=2, name="Slow Feed", url="https://localhost/f2"))
+        db.session.commit()
+        yield cast(FlaskWithServices, my_app)
+        db.session.remove()
+        db.drop_all()
+
+
+def test_record_keeps_the_latest_fetches_of_each_feed(
+    my_app: FlaskWithServices, monkeypatch: pytest.MonkeyPatch
+):
+    fetch_metrics_service = my_app.fetch_metrics_service
+    monkeypatch.setattr(fetch_metrics_service, "rows_per_feed", 3)
+    started = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(5):
+        for feed_id in (1, 2):
+            fetch_metrics_service.record(
+                FeedFetchMetric(
+                    feed_id=feed_id,
+                    started=started + timedelta(hours=i),
+                    total_ms=feed_id * 100 + i,
+                )
+            )
+    db.session.commit()
+
+    stats = fetch_metrics_service.get_feed_stats(2)
+
+    assert [fetch["total_ms"] for fetch in stats["fetches"]] == [204, 203, 202]
+    assert stats["durations"]["total_ms"]["max"] == 204
+    assert FeedFetchMetric.query.filter(FeedFetchMetric.feed_id == 1).count() == 3
+
+
+def test_stats_routes_report_the_fetches_recorded_by_ingestion(
+    my_app: FlaskWithServices,
+):
+    for feed_id, total_ms in ((1, 10), (2, 500)):
+        fetch_metric = FeedFetchMetric(
+            feed_id=feed_id,
+            started=datetime.now(timezone.utc) - timedelta(milliseconds=total_ms),
+            http_status=304,
+        )
+        list(
+            my_app.ingestion_service.ingest_feed_articles(
+                db.session.get(Feed, feed_id), [], fetch_metric
+            )
+        )
+    client = cast(Flask, my_app).test_client()
+
+    feed_stats = client.get("/feeds/2/stats").get_json()["feed_stats"]
+    all_stats = client.get("/feeds/stats").get_json()["feed_stats"]
+
+    assert feed_stats["fetch_count"] == 1
+    assert feed_stats["fetches"][0]["http_status"] == 304
+    assert feed_stats["fetches"][0]["total_ms"] >= 500
+    assert [stats["feed_name"] for stats in all_stats] == ["Slow Feed", "Fast Feed"]
+    assert client.get("/feeds/stats?order_by=nope").status_code == 400
@@ -0,0 +1,150 @@
+import io
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app.services import http_client as http_client_module
+from app.services import rate_limiter as rate_limiter_module
+from app.services.http_client import HttpClient
+from app.services.rate_limiter import RateLimiter
+
+
+def make_response(status_code: int, content: bytes = b"", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = None
+    response._content = content
+    response._content_consumed = True
+    response.headers.update(headers or {})
+    return response
+
+
+@pytest.fixture()
+def http_client(monkeypatch: pytest.MonkeyPatch) -> HttpClient:
+    http_client = HttpClient(
+        retry_statuses=frozenset([429, 503]), max_retries=2, retry_backoff=0.5
+    )
+    # Bodies are set upfront, nothing to stream
+    monkeypatch.setattr(http_client, "_read_body", lambda response, deadline: None)
+    return http_client
+
+
+def test_request_retries_throttled_responses_with_backoff(
+    http_client: HttpClient, monkeypatch: pytest.MonkeyPatch
+):
+    responses = [
+        make_response(503),
+        make_response(429, headers={"Retry-After": "7"}),
+        make_response(200, b"ok"),
+    ]
+    delays: list[float] = []
+    monkeypatch.setattr(
+        http_client.session, "request", lambda *args, **kwargs: responses.pop(0)
+    )
+    monkeypatch.setattr(http_client_module.time, "sleep", delays.append)
+
+    response = http_client.post("https://localhost/model", json={})
+
+    assert response.status_code == 200
+    assert len(delays) == 2
+    assert 0 <= delays[0] <= 0.5
+    assert delays[1] == 7
+
+
+def test_request_gives_up_after_max_retries(
+    http_client: HttpClient, monkeypatch: pytest.MonkeyPatch
+):
+    calls: list[str] = []
+
+    def unavailable(method: str, url: str, **kwargs) -> requests.Response:
+        calls.append(url)
+        return make_response(503)
+
+    monkeypatch.setattr(http_client.session, "request", unavailable)
+    monkeypatch.setattr(http_client_module.time, "sleep", lambda seconds: None)
+
+    assert http_client.get("https://localhost/model").status_code == 503
+    assert len(calls) == 3
+
+
+def test_request_waits_for_the_rate_limit_of_the_url(
+    http_client: HttpClient, monkeypatch: pytest.MonkeyPatch
+):
+    now = [100.0]
+    delays: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        delays.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limiter_module.time, "sleep", sleep)
+    monkeypatch.setattr(
+        http_client.session, "request", lambda *args, **kwargs: make_response(200)
+    )
+    http_client.rate_limiter = RateLimiter(rate=2, burst=2)
+
+    for _ in range(4):
+        http_client.post("https://localhost/model")
+    http_client.post("https://localhost/other-model")
+
+    # The burst goes through at once, then a request every 1/rate seconds, each URL having its own bucket
+    assert delays == [0.5, 0.5]
+
+
+def test_request_retries_timed_out_requests(
+    http_client: HttpClient, monkeypatch: pytest.MonkeyPatch
+):
+    outcomes: list = [requests.Timeout(), make_response(200, b"ok")]
+
+    def flaky(method: str, url: str, **kwargs) -> requests.Response:
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(http_client.session, "request", flaky)
+    monkeypatch.setattr(http_client_module.time, "sleep", lambda seconds: None)
+
+    with pytest.raises(requests.Timeout):
+        http_client.post("https://localhost/model")
+    outcomes.insert(0, requests.Timeout())
+    http_client.retry_exceptions = (requests.Timeout,)
+
+    assert http_client.post("https://localhost/model").status_code == 200
+
+
+def test_request_fails_once_past_the_deadline(monkeypatch: pytest.MonkeyPatch):
+    now = [100.0]
+    timeouts: list = []
+
+    class TricklingBody(io.RawIOBase):
+        def readable(self) -> bool:
+            return True
+
+        def readinto(self, buffer) -> int:
+            # A byte a second: each read is well within the socket timeout, the whole body is not
+            now[0] += 1
+            buffer[:1] = b"x"
+            return 1
+
+    def request(method: str, url: str, timeout, **kwargs) -> requests.Response:
+        timeouts.append(timeout)
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = TricklingBody()
+        return response
+
+    monkeypatch.setattr(http_client_module.time, "monotonic", lambda: now[0])
+    http_client = HttpClient(timeout=(5.0, 30.0))
+    monkeypatch.setattr(http_client.session, "request", request)
+
+    with pytest.raises(requests.Timeout):
+        http_client.get("https://localhost/feed", deadline=103.0)
+    with pytest.raises(requests.Timeout):
+        http_client.get("https://localhost/feed", deadline=now[0])
+    assert timeouts == [(3.0, 3.0)]
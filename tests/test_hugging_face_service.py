@@ -0,0 +1,485 @@
+import json
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Generator, cast
+
+import pytest
+import requests
+from flask import Flask
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app import create_app
+from app.config import Config
+from app.db import db
+from app.models.article import Article
+from app.models.feed import Feed
+from app.models.label import Label
+from app.models.topic import Topic
+from app.models.topic_label import TopicLabel
+from app.services import scoring_model as scoring_model_module
+from app.services import single_flight as single_flight_module
+from app.services.http_client import HttpClient
+from app.services.hugging_face_service import HuggingFaceService
+from app.typing import FlaskWithServices
+
+
+class StubClassifierClient(HttpClient):
+    """Answers classification requests with fixed scores per label, once every hypothesis has been asked about."""
+
+    def __init__(self, scores: dict[str, float], hypothesis_count: int) -> None:
+        super().__init__()
+        self.scores = scores
+        self.requests: list[dict] = []
+        self._all_in_flight = threading.Barrier(hypothesis_count, timeout=5)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self.requests.append(kwargs["json"])
+        # Only returns if the requests of all the hypotheses are in flight at the same time
+        self._all_in_flight.wait()
+        labels = kwargs["json"]["parameters"]["candidate_labels"]
+        result = {"labels": labels, "scores": [self.scores[label] for label in labels]}
+        inputs = kwargs["json"]["inputs"]
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(
+            [result] * len(inputs) if isinstance(inputs, list) else result
+        ).encode("utf-8")
+        return response
+
+
+class StubSummarizerClient(HttpClient):
+    """Answers summarization requests with a fixed summary, recording them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.requests: list[tuple[str, str, dict]] = []
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self.requests.append((method, url, kwargs["json"]))
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'[{"summary_text": "Short"}]'
+        return response
+
+
+@pytest.fixture()
+def summarizer() -> HuggingFaceService:
+    config = Config()
+    config._config = {
+        "huggingface.base-url": "https://localhost/models/",
+        "huggingface.summarization-model": "summarizer",
+    }
+    return HuggingFaceService(config, StubSummarizerClient())
+
+
+@pytest.fixture()
+def my_app() -> Generator[FlaskWithServices]:
+    my_app = cast(Flask, create_app("testing"))
+    with my_app.app_context():
+        db.create_all()
+        db.session.add(Feed(id=1, name="Testing Feed", url="https://localhost/f1"))
+        db.session.add_all(
+            [
+                Topic(id=1, name="T1"),
+                Topic(id=2, name="T2"),
+                Label(id=1, text="L1", hypothesis="H1 {}"),
+                Label(id=2, text="L2", hypothesis="H2 {}"),
+                Label(id=3, text="L3", hypothesis="H2 {}"),
+                TopicLabel(topic_id=1, label_id=1, weight=1.0),
+                TopicLabel(topic_id=1, label_id=2, weight=3.0),
+                TopicLabel(topic_id=2, label_id=3, weight=1.0),
+            ]
+        )
+        db.session.commit()
+        yield cast(FlaskWithServices, my_app)
+        db.session.remove()
+        db.drop_all()
+
+
+def test_add_topic_scores_classifies_hypotheses_concurrently(
+    my_app: FlaskWithServices,
+):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.http_client = StubClassifierClient(
+        {"L1": 0.2, "L2": 0.6, "L3": 0.9}, hypothesis_count=2
+    )
+    article = Article(
+        id=1,
+        feed_id=1,
+        url="https://localhost/f1/a1",
+        title="TA1",
+        summary="Summary",
+        published=datetime.now(timezone.utc),
+    )
+
+    with db.session.no_autoflush:
+        scored_labels, scored_topics = ai_service.add_topic_scores(article)
+
+    assert sorted(
+        (r["parameters"]["hypothesis_template"], r["parameters"]["candidate_labels"])
+        for r in ai_service.http_client.requests
+    ) == [("H1 {}", ["L1"]), ("H2 {}", ["L2", "L3"])]
+    assert {sl.label_id: float(sl.score) for sl in scored_labels} == pytest.approx(
+        {1: 0.2, 2: 0.6, 3: 0.9}
+    )
+    # Weighted mean of the scores of the labels of each topic, with one score per topic
+    assert {st.topic_id: float(st.score) for st in scored_topics} == pytest.approx(
+        {1: (0.2 * 1 + 0.6 * 3) / 4, 2: 0.9}
+    )
+
+
+def test_add_topic_scores_batch_sends_the_articles_together(
+    my_app: FlaskWithServices,
+):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.http_client = StubClassifierClient(
+        {"L1": 0.2, "L2": 0.6, "L3": 0.9}, hypothesis_count=2
+    )
+    # Opted into, as the hosted zero-shot pipeline only takes a single text
+    ai_service.classification_batch_size = 8
+    articles = [
+        Article(
+            id=i,
+            feed_id=1,
+            url=f"https://localhost/f1/a{i}",
+            title=f"TA{i}",
+            summary=f"Summary {i}",
+            published=datetime.now(timezone.utc),
+        )
+        for i in range(1, 4)
+    ]
+
+    with db.session.no_autoflush:
+        scores = ai_service.add_topic_scores_batch(articles)
+
+    assert sorted(r["inputs"] for r in ai_service.http_client.requests) == [
+        ["Summary 1", "Summary 2", "Summary 3"],
+        ["Summary 1", "Summary 2", "Summary 3"],
+    ]
+    assert [
+        sorted((sl.article_id, sl.label_id) for sl in scored_labels)
+        for scored_labels, _ in scores
+    ] == [[(i, 1), (i, 2), (i, 3)] for i in range(1, 4)]
+    assert all(len(scored_topics) == 2 for _, scored_topics in scores)
+
+
+def test_add_topic_scores_only_sends_the_labels_not_cached(
+    my_app: FlaskWithServices,
+):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.http_client = StubClassifierClient(
+        {"L1": 0.2, "L2": 0.6, "L3": 0.9, "L4": 0.4}, hypothesis_count=1
+    )
+    article = Article(
+        id=1,
+        feed_id=1,
+        url="https://localhost/f1/a1",
+        title="TA1",
+        summary="Summary",
+        published=datetime.now(timezone.utc),
+    )
+    with db.session.no_autoflush:
+        ai_service.add_topic_scores(article)
+        ai_service.http_client.requests.clear()
+
+        # Scored again with the same labels, everything comes from the cache
+        scored_labels, _ = ai_service.add_topic_scores(article)
+        assert ai_service.http_client.requests == []
+        assert len(scored_labels) == 3
+
+    db.session.add_all(
+        [
+            Label(id=4, text="L4", hypothesis="H2 {}"),
+            TopicLabel(topic_id=2, label_id=4, weight=1.0),
+        ]
+    )
+    db.session.commit()
+    with db.session.no_autoflush:
+        scored_labels, _ = ai_service.add_topic_scores(article)
+
+    assert [
+        (r["parameters"]["hypothesis_template"], r["parameters"]["candidate_labels"])
+        for r in ai_service.http_client.requests
+    ] == [("H2 {}", ["L4"])]
+    assert {sl.label_id: float(sl.score) for sl in scored_labels} == pytest.approx(
+        {1: 0.2, 2: 0.6, 3: 0.9, 4: 0.4}
+    )
+
+
+def test_add_topic_scores_reuses_the_scoring_model_until_labels_change(
+    my_app: FlaskWithServices,
+):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.http_client = StubClassifierClient(
+        {"L1": 0.2, "L2": 0.6, "L3": 0.9}, hypothesis_count=1
+    )
+    article = Article(
+        id=1,
+        feed_id=1,
+        url="https://localhost/f1/a1",
+        title="TA1",
+        summary="Summary",
+        published=datetime.now(timezone.utc),
+    )
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with db.session.no_autoflush:
+        ai_service.add_topic_scores(article)
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            ai_service.add_topic_scores(article)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+    assert statements == []
+
+    db.session.get(TopicLabel, (1, 2)).weight = 1.0
+    db.session.commit()
+    with db.session.no_autoflush:
+        _, scored_topics = ai_service.add_topic_scores(article)
+
+    assert {st.topic_id: float(st.score) for st in scored_topics} == pytest.approx(
+        {1: (0.2 + 0.6) / 2, 2: 0.9}
+    )
+
+
+def test_add_topic_scores_sees_label_changes_committed_by_other_processes(
+    my_app: FlaskWithServices, monkeypatch: pytest.MonkeyPatch
+):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.http_client = StubClassifierClient(
+        {"L1": 0.2, "L2": 0.6, "L3": 0.9}, hypothesis_count=1
+    )
+    article = Article(
+        id=1,
+        feed_id=1,
+        url="https://localhost/f1/a1",
+        title="TA1",
+        summary="Summary",
+        published=datetime.now(timezone.utc),
+    )
+    with db.session.no_autoflush:
+        ai_service.add_topic_scores(article)
+
+    # Committed as by another process, whose commits this one is not notified of
+    monkeypatch.setattr(scoring_model_module, "invalidate_scoring_models", lambda: None)
+    db.session.get(TopicLabel, (1, 2)).weight = 1.0
+    db.session.commit()
+    with db.session.no_autoflush:
+        _, stale_scored_topics = ai_service.add_topic_scores(article)
+        monkeypatch.setattr(ai_service.scoring_model_cache, "check_interval", 0.0)
+        _, scored_topics = ai_service.add_topic_scores(article)
+
+    assert {
+        st.topic_id: float(st.score) for st in stale_scored_topics
+    } == pytest.approx({1: (0.2 + 0.6 * 3) / 4, 2: 0.9})
+    assert {st.topic_id: float(st.score) for st in scored_topics} == pytest.approx(
+        {1: (0.2 + 0.6) / 2, 2: 0.9}
+    )
+
+
+def test_add_topic_scores_leaves_disabled_topics_out(my_app: FlaskWithServices):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.http_client = StubClassifierClient(
+        {"L1": 0.2, "L2": 0.6}, hypothesis_count=2
+    )
+    db.session.add(TopicLabel(topic_id=2, label_id=1, weight=1.0))
+    db.session.get(Topic, 2).enabled = False
+    db.session.commit()
+    article = Article(
+        id=1,
+        feed_id=1,
+        url="https://localhost/f1/a1",
+        title="TA1",
+        summary="Summary",
+        published=datetime.now(timezone.utc),
+    )
+
+    with db.session.no_autoflush:
+        _, scored_topics = ai_service.add_topic_scores(article)
+
+    assert [st.topic_id for st in scored_topics] == [1]
+
+
+def test_add_topic_scores_splits_large_label_sets_into_chunks(
+    my_app: FlaskWithServices,
+):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.max_candidate_labels = 1
+    ai_service.http_client = StubClassifierClient(
+        {"L1": 0.2, "L2": 0.6, "L3": 0.9}, hypothesis_count=3
+    )
+    article = Article(
+        id=1,
+        feed_id=1,
+        url="https://localhost/f1/a1",
+        title="TA1",
+        summary="Summary",
+        published=datetime.now(timezone.utc),
+    )
+
+    with db.session.no_autoflush:
+        scored_labels, scored_topics = ai_service.add_topic_scores(article)
+
+    # Chunks are all in flight at once, and their scores merged
+    assert sorted(
+        (r["parameters"]["hypothesis_template"], r["parameters"]["candidate_labels"])
+        for r in ai_service.http_client.requests
+    ) == [("H1 {}", ["L1"]), ("H2 {}", ["L2"]), ("H2 {}", ["L3"])]
+    assert {sl.label_id: float(sl.score) for sl in scored_labels} == pytest.approx(
+        {1: 0.2, 2: 0.6, 3: 0.9}
+    )
+    assert len(scored_topics) == 2
+
+
+class StubEmbeddingClient(HttpClient):
+    """Answers embedding requests with fixed vectors per text."""
+
+    def __init__(self, vectors: dict[str, list[float]]) -> None:
+        super().__init__()
+        self.vectors = vectors
+        self.inputs: list[str] = []
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self.inputs.extend(kwargs["json"]["inputs"])
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(
+            [self.vectors[text] for text in kwargs["json"]["inputs"]]
+        ).encode("utf-8")
+        return response
+
+
+def test_embedding_mode_scores_labels_by_cosine_similarity(
+    my_app: FlaskWithServices,
+):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.scoring_mode = "embedding"
+    ai_service.http_client = StubEmbeddingClient(
+        {
+            "Summary": [3.0, 4.0],
+            "H1 L1": [1.0, 0.0],
+            "H2 L2": [0.0, 2.0],
+            "H2 L3": [-1.0, 0.0],
+            "H2 L4": [4.0, 3.0],
+        }
+    )
+    article = Article(
+        id=1,
+        feed_id=1,
+        url="https://localhost/f1/a1",
+        title="TA1",
+        summary="Summary",
+        published=datetime.now(timezone.utc),
+    )
+
+    with db.session.no_autoflush:
+        scored_labels, _ = ai_service.add_topic_scores(article)
+
+    assert sorted(ai_service.http_client.inputs) == [
+        "H1 L1",
+        "H2 L2",
+        "H2 L3",
+        "Summary",
+    ]
+    # Negative similarities score 0
+    assert {sl.label_id: float(sl.score) for sl in scored_labels} == pytest.approx(
+        {1: 0.6, 2: 0.8, 3: 0.0}
+    )
+
+    db.session.add_all(
+        [
+            Label(id=4, text="L4", hypothesis="H2 {}"),
+            TopicLabel(topic_id=2, label_id=4, weight=1.0),
+        ]
+    )
+    db.session.commit()
+    ai_service.http_client.inputs.clear()
+    with db.session.no_autoflush:
+        [scored_labels] = ai_service.add_label_scores_batch([article], [4])
+
+    # The article embedding is reused, the new label costs a single embedding
+    assert ai_service.http_client.inputs == ["H2 L4"]
+    assert [(sl.label_id, float(sl.score)) for sl in scored_labels] == [
+        (4, pytest.approx(0.96))
+    ]
+
+
+def test_add_generated_summary_summarizes_identical_texts_once(
+    summarizer: HuggingFaceService,
+):
+    summarizer.add_generated_summary(Article(full_text="Long  text\n"))
+    article = Article(full_text=" Long text")
+    summary = summarizer.add_generated_summary(article)
+
+    assert summary == article.ai_summary == "Short"
+    assert len(summarizer.http_client.requests) == 1
+    assert summarizer.get_cache_stats()["summaries"]["hits"] == 1
+    assert summarizer.get_cache_stats()["summaries"]["misses"] == 1
+
+
+def test_ai_cache_stats_route_reports_the_summary_cache(my_app: FlaskWithServices):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.http_client = StubSummarizerClient()
+    for _ in range(3):
+        ai_service.add_generated_summary(Article(full_text="Long text"))
+
+    response = cast(Flask, my_app).test_client().get("/articles/ai-cache/stats")
+
+    assert response.status_code == 200
+    assert response.get_json()["ai_cache_stats"] == {
+        "summaries": {"hits": 2, "misses": 1, "hit_ratio": 2 / 3, "entries": 1}
+    }
+
+
+def test_add_generated_summary_posts_through_the_injected_client(
+    summarizer: HuggingFaceService,
+):
+    article = Article(full_text="Long text")
+
+    summary = summarizer.add_generated_summary(article)
+
+    assert summary == article.ai_summary == "Short"
+    assert summarizer.http_client.requests == [
+        ("POST", "https://localhost/models/summarizer", {"inputs": "Long text"})
+    ]
+
+
+def test_add_generated_summary_coalesces_identical_calls_in_flight(
+    summarizer: HuggingFaceService, monkeypatch: pytest.MonkeyPatch
+):
+    joined = threading.Semaphore(0)
+
+    class JoiningFuture(Future):
+        def result(self, timeout: float | None = None):
+            joined.release()
+            return super().result(timeout)
+
+    class JoinedSummarizerClient(StubSummarizerClient):
+        def request(self, method: str, url: str, **kwargs) -> requests.Response:
+            # Only answers once the two other calls are waiting for this one
+            for _ in range(2):
+                assert joined.acquire(timeout=5)
+            return super().request(method, url, **kwargs)
+
+    monkeypatch.setattr(single_flight_module, "Future", JoiningFuture)
+    summarizer.http_client = JoinedSummarizerClient()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        summaries = list(
+            executor.map(
+                lambda _: summarizer.add_generated_summary(
+                    Article(full_text="Long text")
+                ),
+                range(3),
+            )
+        )
+
+    assert summaries == ["Short"] * 3
+    assert len(summarizer.http_client.requests) == 1
@@ -0,0 +1,149 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Generator, cast
+
+import pytest
+import requests
+from flask import Flask, current_app
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app import create_app
+from app.db import db
+from app.models.article import Article, ArticleHistory
+from app.models.feed import Feed
+from app.models.feed_fetch_metric import FeedFetchMetric
+from app.models.ingestion_job import JobStatus
+from app.models.label import Label
+from app.models.scored_label import ScoredLabel, ScoredLabelHistory
+from app.models.scored_topic import ScoredTopic
+from app.services.ingestion_service import IngestionService
+from app.typing import FlaskWithServices
+
+
+class StubAIService:
+    def add_topic_scores(
+        self, article: Article
+    ) -> tuple[list[ScoredLabel], list[ScoredTopic]]:
+        label = db.session.get(Label, 1)
+        return [ScoredLabel(article=article, label=label, score=0.5)], []
+
+    def add_topic_scores_batch(
+        self, articles: list[Article]
+    ) -> list[tuple[list[ScoredLabel], list[ScoredTopic]]]:
+        return [self.add_topic_scores(article) for article in articles]
+
+
+@pytest.fixture()
+def ingestion_service() -> Generator[IngestionService]:
+    my_app = cast(Flask, create_app("testing"))
+    with my_app.app_context():
+        db.create_all()
+        db.session.add(Feed(id=1, name="Testing Feed", url="https://localhost/f1"))
+        db.session.add(Label(id=1, text="L1", hypothesis="LH1"))
+        db.session.commit()
+        ingestion_service = cast(FlaskWithServices, my_app).ingestion_service
+        ingestion_service.ai_service = StubAIService()
+        yield ingestion_service
+        db.session.remove()
+        db.drop_all()
+
+
+def test_feed_articles_are_saved_in_batches(
+    ingestion_service: IngestionService, monkeypatch: pytest.MonkeyPatch
+):
+    published = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    articles = [
+        Article(
+            feed_id=1,
+            url=f"https://localhost/f1/a{i}",
+            title=f"TA{i}",
+            summary="X",
+            published=published + timedelta(hours=i),
+        )
+        for i in range(5)
+    ]
+    commits: list[int] = []
+
+    def count_commit(session) -> None:
+        commits.append(len(commits))
+
+    monkeypatch.setattr(ingestion_service, "batch_size", 2)
+    event.listen(db.session, "after_commit", count_commit)
+    try:
+        results = list(
+            ingestion_service.ingest_feed_articles(db.session.get(Feed, 1), articles)
+        )
+    finally:
+        event.remove(db.session, "after_commit", count_commit)
+
+    assert [response["article"]["url"] for _, response in results] == [
+        article.url for article in articles
+    ]
+    assert all(processed for processed, _ in results)
+    assert all(response["article"]["id"] is not None for _, response in results)
+    assert len(commits) == 3
+    assert db.session.get(Feed, 1).last_fetch == (
+        published + timedelta(hours=4)
+    ).replace(tzinfo=None)
+    assert db.session.query(ArticleHistory).count() == 5
+    assert db.session.query(ScoredLabelHistory).count() == 5
+
+
+def test_feed_validators_are_saved_with_the_last_batch_only(
+    ingestion_service: IngestionService, monkeypatch: pytest.MonkeyPatch
+):
+    feed = db.session.get(Feed, 1)
+    feed.etag = "v1"
+    db.session.commit()
+    articles = [
+        Article(
+            feed_id=1,
+            url=f"https://localhost/f1/a{i}",
+            title=f"TA{i}",
+            summary="X",
+            published=datetime(2025, 1, 1, i, tzinfo=timezone.utc),
+        )
+        for i in range(2)
+    ]
+    add_topic_scores_batch = ingestion_service.ai_service.add_topic_scores_batch
+
+    def fail_second_batch(batch: list[Article]):
+        if batch[0] is articles[1]:
+            raise RuntimeError("Scoring failed")
+        return add_topic_scores_batch(batch)
+
+    monkeypatch.setattr(ingestion_service, "batch_size", 1)
+    monkeypatch.setattr(
+        ingestion_service.ai_service, "add_topic_scores_batch", fail_second_batch
+    )
+    # As left by the fetch of the feed
+    feed.etag = "v2"
+    feed.last_modified = "Wed, 01 Jan 2025 01:00:00 GMT"
+    with pytest.raises(RuntimeError, match="Scoring failed"):
+        list(ingestion_service.ingest_feed_articles(feed, articles))
+    db.session.rollback()
+
+    assert db.session.query(Article).count() == 1
+    assert (feed.etag, feed.last_modified) == ("v1", None)
+
+
+def test_fetch_job_fails_the_feeds_whose_download_failed(
+    ingestion_service: IngestionService, monkeypatch: pytest.MonkeyPatch
+):
+    job_service = cast(FlaskWithServices, current_app).job_service
+    job = job_service.enqueue(IngestionService.FETCH_FEEDS_JOB, feed_ids=[1])
+
+    def failing_get(url: str, **kwargs) -> requests.Response:
+        raise requests.ConnectionError(f"Cannot connect to {url}")
+
+    monkeypatch.setattr(ingestion_service.rss_service.http_client, "get", failing_get)
+    with pytest.raises(RuntimeError, match=r"Failed to ingest feeds \[1\]"):
+        ingestion_service.run_fetch_job(job, lambda: True)
+
+    job_feed = job.feeds[0]
+    assert job_feed.status == JobStatus.FAILED.name
+    assert "Cannot connect to https://localhost/f1" in job_feed.error
+    assert db.session.query(FeedFetchMetric).one().error == job_feed.error
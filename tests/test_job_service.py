@@ -0,0 +1,92 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Generator, cast
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app import create_app
+from app.db import db
+from app.models.ingestion_job import IngestionJob, JobStatus
+from app.services.job_service import JobService
+from app.typing import FlaskWithServices
+
+
+@pytest.fixture()
+def job_service() -> Generator[JobService]:
+    my_app = cast(Flask, create_app("testing"))
+    with my_app.app_context():
+        db.create_all()
+        yield cast(FlaskWithServices, my_app).job_service
+        db.session.remove()
+        db.drop_all()
+
+
+def test_claim_leases_a_job_to_a_single_worker(job_service: JobService):
+    job = job_service.enqueue("testing", payload={"x": 1})
+
+    claimed = job_service.claim("worker-1")
+
+    assert claimed is not None and claimed.id == job.id
+    assert claimed.status == JobStatus.RUNNING.name
+    assert claimed.lease_owner == "worker-1"
+    assert claimed.attempts == 1
+    assert job_service.get_payload(claimed) == {"x": 1}
+    assert job_service.claim("worker-2") is None
+
+
+def test_expired_lease_can_be_claimed_again(job_service: JobService):
+    job = job_service.enqueue("testing")
+    job_service.claim("worker-1")
+    job.lease_expires = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.session.commit()
+
+    claimed = job_service.claim("worker-2")
+
+    assert claimed is not None and claimed.lease_owner == "worker-2"
+    assert claimed.attempts == 2
+    assert not job_service.renew_lease(claimed, "worker-1")
+    assert job_service.renew_lease(claimed, "worker-2")
+
+
+def test_failed_job_is_retried_until_it_runs_out_of_attempts(
+    job_service: JobService,
+):
+    job_service.retry_backoff_seconds = 0
+    job = job_service.enqueue("testing")
+    for attempt in range(1, job.max_attempts + 1):
+        claimed = job_service.claim("worker-1")
+        assert claimed is not None and claimed.attempts == attempt
+        job_service.fail(claimed, "worker-1", "boom")
+
+    job = db.session.get(IngestionJob, job.id)
+    assert job.status == JobStatus.FAILED.name
+    assert job.error == "boom"
+    assert job_service.claim("worker-1") is None
+
+    job_service.retry(job)
+
+    assert job.error is None
+    assert job_service.claim("worker-1") is not None
+
+
+def test_job_whose_lease_was_lost_is_left_to_its_new_owner(job_service: JobService):
+    job = job_service.enqueue("testing")
+    job_service.claim("worker-1")
+    job.lease_expires = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.session.commit()
+    claimed = job_service.claim("worker-2")
+
+    assert not job_service.fail(claimed, "worker-1", "boom")
+    assert not job_service.complete(claimed, "worker-1")
+
+    job = db.session.get(IngestionJob, job.id)
+    assert job.status == JobStatus.RUNNING.name
+    assert job.lease_owner == "worker-2"
+    assert job.error is None
+    assert job_service.complete(job, "worker-2")
+    assert job.status == JobStatus.SUCCEEDED.name
+    assert job.lease_owner is None
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app.services import rate_limiter as rate_limiter_module
+from app.services.rate_limiter import RateLimiter
+
+
+@pytest.fixture()
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Time as seen by the rate limiter, sleeping advancing it rather than waiting."""
+    now = [100.0]
+
+    def sleep(seconds: float) -> None:
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limiter_module.time, "sleep", sleep)
+    return now
+
+
+def test_zero_rate_disables_the_limiter(clock: list[float]):
+    rate_limiter = RateLimiter(rate=0, burst=1)
+
+    assert [rate_limiter.acquire("url") for _ in range(100)] == [0.0] * 100
+    assert clock == [100.0]
+
+
+def test_burst_goes_through_at_once_then_tokens_refill_at_the_rate(
+    clock: list[float],
+):
+    rate_limiter = RateLimiter(rate=4, burst=3)
+
+    assert [rate_limiter.acquire("url") for _ in range(5)] == [0, 0, 0, 0.25, 0.25]
+    assert rate_limiter.acquire("other-url") == 0
+
+    clock[0] += 10
+    # Idle, the bucket refills up to the burst only
+    assert [rate_limiter.acquire("url") for _ in range(4)] == [0, 0, 0, 0.25]
@@ -0,0 +1,314 @@
+import io
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Generator, cast
+
+import feedparser
+import pytest
+import requests
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app import create_app
+from app.config import Config
+from app.db import db
+from app.exceptions.feed_fetch_error import FeedFetchError
+from app.models.article import Article
+from app.models.feed import Feed
+from app.models.feed_fetch_metric import FeedFetchMetric
+from app.services.rss_service import FullTextFetch, RSSService
+from app.typing import FlaskWithServices
+
+
+@pytest.fixture()
+def my_app() -> Generator[Flask]:
+    my_app = cast(Flask, create_app("testing"))
+    with my_app.app_context():
+        db.create_all()
+        db.session.add_all(
+            [
+                Feed(id=i, name=f"Testing Feed {i}", url=f"https://localhost/f{i}")
+                for i in range(1, 5)
+            ]
+        )
+        db.session.commit()
+        yield my_app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_fetch_all_articles_runs_feeds_concurrently(
+    my_app: Flask, monkeypatch: pytest.MonkeyPatch
+):
+    rss_service: RSSService = cast(FlaskWithServices, my_app).rss_service
+
+    def slow_fetch_articles(
+        feed: Feed, seen_urls: set[str], fetch_metric: FeedFetchMetric
+    ) -> list[Article]:
+        time.sleep(0.2)
+        return []
+
+    monkeypatch.setattr(rss_service, "max_workers", 4)
+    monkeypatch.setattr(rss_service, "fetch_articles", slow_fetch_articles)
+    started = time.monotonic()
+    results = list(rss_service.fetch_all_articles(Feed.query.all()))
+    elapsed = time.monotonic() - started
+
+    assert sorted(feed.id for feed, _ in results) == [1, 2, 3, 4]
+    assert all(feed in db.session for feed, _ in results)
+    assert elapsed < 0.6
+
+
+def test_page_downloads_are_truncated_to_max_page_bytes(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    config = Config()
+    config._config = {"rss.max-page-bytes": 64}
+    rss_service = RSSService(config)
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(b"x" * 1000)
+    monkeypatch.setattr(
+        rss_service.http_client.session, "request", lambda *args, **kwargs: response
+    )
+
+    assert rss_service.http_client.get("https://localhost/f1/long").content == b"x" * 64
+
+
+def test_page_downloads_are_capped_per_host(monkeypatch: pytest.MonkeyPatch):
+    config = Config()
+    config._config = {"rss.max-connections-per-host": 2}
+    http_client = RSSService(config).http_client
+    monkeypatch.setattr(http_client, "_read_body", lambda response, deadline: None)
+    # Requests to localhost only go through two at a time, each waiting for another one to be in flight
+    paired = threading.Barrier(2, timeout=5)
+    in_flight: dict[str, int] = {"localhost": 0, "other": 0}
+    max_in_flight: dict[str, int] = {"localhost": 0, "other": 0}
+    lock = threading.Lock()
+
+    def request(method: str, url: str, **kwargs) -> requests.Response:
+        host = url.split("/")[2]
+        with lock:
+            in_flight[host] += 1
+            max_in_flight[host] = max(max_in_flight[host], in_flight[host])
+        if host == "localhost":
+            paired.wait()
+        with lock:
+            in_flight[host] -= 1
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+    monkeypatch.setattr(http_client.session, "request", request)
+    threads = [
+        threading.Thread(target=http_client.get, args=(f"https://{host}/page",))
+        for host in ["localhost"] * 6 + ["other"]
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_in_flight["localhost"] == 2
+    assert max_in_flight["other"] == 1
+
+
+def test_fetch_articles_keeps_the_articles_whose_page_download_failed(
+    my_app: Flask, monkeypatch: pytest.MonkeyPatch
+):
+    rss_service: RSSService = cast(FlaskWithServices, my_app).rss_service
+    parsed = feedparser.parse(
+        """<rss version="2.0"><channel><title>F1</title>
+        <item><title>Down</title><link>https://localhost/f1/down</link><description>X</description>
+            <pubDate>Mon, 06 Oct 2025 10:00:00 GMT</pubDate></item>
+        <item><title>Up</title><link>https://localhost/f1/up</link><description>X</description>
+            <pubDate>Mon, 06 Oct 2025 11:00:00 GMT</pubDate></item>
+        </channel></rss>"""
+    )
+    parsed["status"] = 200
+
+    def get(url: str, **kwargs) -> requests.Response:
+        if url.endswith("/down"):
+            raise requests.ConnectionError(f"Cannot connect to {url}")
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"<p>Full text</p>"
+        return response
+
+    monkeypatch.setattr(
+        rss_service, "_fetch_feed", lambda feed, fetch_metric, deadline: parsed
+    )
+    monkeypatch.setattr(rss_service.http_client, "get", get)
+    fetch_metric = FeedFetchMetric(feed_id=1, started=datetime.now(timezone.utc))
+
+    articles = rss_service.fetch_articles(db.session.get(Feed, 1), None, fetch_metric)
+
+    assert sorted((article.url, article.full_text) for article in articles) == [
+        ("https://localhost/f1/down", None),
+        ("https://localhost/f1/up", "Full text"),
+    ]
+    assert (fetch_metric.page_count, fetch_metric.page_error_count) == (2, 1)
+
+
+def test_fetch_articles_sends_validators_and_stops_on_not_modified(
+    my_app: Flask, monkeypatch: pytest.MonkeyPatch
+):
+    rss_service: RSSService = cast(FlaskWithServices, my_app).rss_service
+    sent_headers = {}
+
+    def not_modified_get(url: str, headers: dict, **kwargs) -> requests.Response:
+        sent_headers.update(headers)
+        response = requests.Response()
+        response.status_code = 304
+        response._content = b""
+        return response
+
+    monkeypatch.setattr(rss_service.http_client, "get", not_modified_get)
+    feed = Feed(
+        id=5,
+        name="Unchanged Feed",
+        url="https://localhost/f5",
+        etag='"abc"',
+        last_modified="Wed, 01 Oct 2025 10:00:00 GMT",
+    )
+
+    assert rss_service.fetch_articles(feed) == []
+    assert sent_headers == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 01 Oct 2025 10:00:00 GMT",
+    }
+
+
+def test_fetch_articles_skips_known_urls_before_downloading(
+    my_app: Flask, monkeypatch: pytest.MonkeyPatch
+):
+    rss_service: RSSService = cast(FlaskWithServices, my_app).rss_service
+    db.session.add(
+        Article(
+            feed_id=1,
+            url="https://localhost/f1/stored",
+            title="Stored",
+            summary="X",
+            published=datetime.now(timezone.utc),
+        )
+    )
+    db.session.commit()
+    parsed = feedparser.parse(
+        """<rss version="2.0"><channel><title>F1</title>
+        <item><title>Stored</title><link>https://localhost/f1/stored</link><description>X</description>
+            <pubDate>Mon, 06 Oct 2025 10:00:00 GMT</pubDate></item>
+        <item><title>Seen</title><link>https://localhost/f2/seen</link><description>X</description>
+            <pubDate>Mon, 06 Oct 2025 11:00:00 GMT</pubDate></item>
+        <item><title>New</title><link>https://localhost/f1/new</link><description>X</description>
+            <pubDate>Mon, 06 Oct 2025 12:00:00 GMT</pubDate></item>
+        <item><title>New again</title><link>https://localhost/f1/new</link><description>X</description>
+            <pubDate>Mon, 06 Oct 2025 13:00:00 GMT</pubDate></item>
+        </channel></rss>"""
+    )
+    parsed["status"] = 200
+    downloaded_urls = []
+
+    def get_full_text(url: str) -> FullTextFetch:
+        downloaded_urls.append(url)
+        return FullTextFetch("Full text", 100, 0.0, 0.0, False, False)
+
+    monkeypatch.setattr(
+        rss_service, "_fetch_feed", lambda feed, fetch_metric, deadline: parsed
+    )
+    monkeypatch.setattr(rss_service, "_get_full_text", get_full_text)
+    seen_urls = {"https://localhost/f2/seen"}
+    fetch_metric = FeedFetchMetric(feed_id=1, started=datetime.now(timezone.utc))
+
+    articles = rss_service.fetch_articles(
+        db.session.get(Feed, 1), seen_urls, fetch_metric
+    )
+
+    assert [article.url for article in articles] == ["https://localhost/f1/new"]
+    assert downloaded_urls == ["https://localhost/f1/new"]
+    assert "https://localhost/f1/new" in seen_urls
+    assert (fetch_metric.entry_count, fetch_metric.new_article_count) == (4, 1)
+    assert (fetch_metric.page_count, fetch_metric.page_bytes) == (1, 100)
+
+
+def test_fetch_articles_stops_waiting_for_pages_past_the_feed_deadline(
+    my_app: Flask, monkeypatch: pytest.MonkeyPatch
+):
+    rss_service: RSSService = cast(FlaskWithServices, my_app).rss_service
+    parsed = feedparser.parse(
+        """<rss version="2.0"><channel><title>F1</title>
+        <item><title>Fast</title><link>https://localhost/f1/fast</link><description>X</description>
+            <pubDate>Mon, 06 Oct 2025 10:00:00 GMT</pubDate></item>
+        <item><title>Stuck</title><link>https://localhost/f1/stuck</link><description>X</description>
+            <pubDate>Mon, 06 Oct 2025 11:00:00 GMT</pubDate></item>
+        </channel></rss>"""
+    )
+    parsed["status"] = 200
+    unstuck = threading.Event()
+
+    def get_full_text(url: str) -> FullTextFetch:
+        if url.endswith("/stuck"):
+            unstuck.wait(timeout=10)
+        return FullTextFetch("Full text", 100, 0.0, 0.0, False, False)
+
+    monkeypatch.setattr(
+        rss_service, "_fetch_feed", lambda feed, fetch_metric, deadline: parsed
+    )
+    monkeypatch.setattr(rss_service, "_get_full_text", get_full_text)
+    monkeypatch.setattr(rss_service, "feed_deadline", 0.2)
+    fetch_metric = FeedFetchMetric(feed_id=1, started=datetime.now(timezone.utc))
+
+    try:
+        articles = rss_service.fetch_articles(
+            db.session.get(Feed, 1), None, fetch_metric
+        )
+    finally:
+        unstuck.set()
+
+    assert sorted((article.url, article.full_text) for article in articles) == [
+        ("https://localhost/f1/fast", "Full text"),
+        ("https://localhost/f1/stuck", None),
+    ]
+    assert (fetch_metric.page_count, fetch_metric.page_error_count) == (2, 1)
+
+
+def test_fetch_articles_fails_when_the_feed_document_misses_the_deadline(
+    my_app: Flask, monkeypatch: pytest.MonkeyPatch
+):
+    rss_service: RSSService = cast(FlaskWithServices, my_app).rss_service
+    requested_urls: list[str] = []
+    monkeypatch.setattr(
+        rss_service.http_client.session,
+        "request",
+        lambda method, url, **kwargs: requested_urls.append(url),
+    )
+    monkeypatch.setattr(rss_service, "feed_deadline", 0.0)
+
+    with pytest.raises(FeedFetchError):
+        rss_service.fetch_articles(db.session.get(Feed, 1))
+    assert requested_urls == []
+
+
+def test_cached_page_texts_are_kept_apart_per_extraction_settings(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+):
+    def get_full_text(config_values: dict) -> str | None:
+        config = Config()
+        config._config = {"content-cache.dir": str(tmp_path), **config_values}
+        rss_service = RSSService(config)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"<p>Full text</p>"
+        monkeypatch.setattr(
+            rss_service.http_client, "get", lambda url, **kwargs: response
+        )
+        return rss_service._get_full_text("https://localhost/f1/a1").text
+
+    assert get_full_text({"extraction.max-chars": 4}) == "Full"
+    assert get_full_text({"extraction.max-chars": 9}) == "Full text"
+    assert get_full_text({"extraction.engine": "soup", "extraction.max-chars": 4}) == (
+        "Full"
+    )
@@ -0,0 +1,199 @@
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Generator, cast
+
+import pytest
+import requests
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app import create_app
+from app.db import db
+from app.models.article import Article
+from app.models.feed import Feed
+from app.models.ingestion_job import IngestionJob, JobStatus
+from app.models.label import Label
+from app.models.mixins.audit import ChangeType
+from app.models.scored_label import ScoredLabel
+from app.models.scored_topic import ScoredTopic, ScoredTopicHistory
+from app.models.topic import Topic
+from app.models.topic_label import TopicLabel
+from app.services.http_client import HttpClient
+from app.services.hugging_face_service import HuggingFaceService
+from app.typing import FlaskWithServices
+from app.workers.ingestion_worker import IngestionWorker
+
+
+class StubClassifierClient(HttpClient):
+    """Answers classification requests with fixed scores per label."""
+
+    def __init__(self, scores: dict[str, float]) -> None:
+        super().__init__()
+        self.scores = scores
+        self.requests: list[dict] = []
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self.requests.append(kwargs["json"])
+        labels = kwargs["json"]["parameters"]["candidate_labels"]
+        result = {"labels": labels, "scores": [self.scores[label] for label in labels]}
+        inputs = kwargs["json"]["inputs"]
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(
+            [result] * len(inputs) if isinstance(inputs, list) else result
+        ).encode("utf-8")
+        return response
+
+
+@pytest.fixture()
+def my_app() -> Generator[FlaskWithServices]:
+    my_app = cast(Flask, create_app("testing"))
+    with my_app.app_context():
+        db.create_all()
+        db.session.add(Feed(id=1, name="Testing Feed", url="https://localhost/f1"))
+        db.session.add_all(
+            [
+                Topic(id=1, name="T1"),
+                Topic(id=2, name="T2"),
+                Label(id=1, text="L1", hypothesis="H1 {}"),
+                Label(id=2, text="L2", hypothesis="H2 {}"),
+                TopicLabel(topic_id=1, label_id=1, weight=1.0),
+                TopicLabel(topic_id=2, label_id=2, weight=1.0),
+            ]
+        )
+        for i in range(1, 4):
+            db.session.add(
+                Article(
+                    id=i,
+                    feed_id=1,
+                    url=f"https://localhost/f1/a{i}",
+                    title=f"TA{i}",
+                    summary=f"Summary {i}",
+                    published=datetime.now(timezone.utc),
+                )
+            )
+            db.session.add_all(
+                [
+                    ScoredLabel(article_id=i, label_id=1, score=0.2),
+                    ScoredLabel(article_id=i, label_id=2, score=0.6),
+                    ScoredTopic(article_id=i, topic_id=1, score=0.2),
+                    ScoredTopic(
+                        article_id=i, topic_id=2, score=0.6, manually_set=i == 3
+                    ),
+                ]
+            )
+        db.session.add(Label(id=3, text="L3", hypothesis="H2 {}"))
+        db.session.commit()
+        yield cast(FlaskWithServices, my_app)
+        db.session.remove()
+        db.drop_all()
+
+
+def test_label_added_to_a_topic_gets_scored_for_the_existing_articles(
+    my_app: FlaskWithServices,
+):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.http_client = StubClassifierClient({"L1": 0.2, "L2": 0.6, "L3": 1.0})
+    client = cast(Flask, my_app).test_client()
+
+    response = client.post("/labels/3/topic/2", json={"weight": 3.0})
+    assert response.status_code == 201
+    job_id = response.get_json()["ingestion_job"]["id"]
+    assert IngestionWorker(my_app).run_next()
+
+    job = db.session.get(IngestionJob, job_id)
+    assert job.status == JobStatus.SUCCEEDED.name
+    assert my_app.job_service.get_payload(job) == {"label_ids": [3]}
+    assert sorted(
+        (r["inputs"], r["parameters"]["candidate_labels"])
+        for r in ai_service.http_client.requests
+    ) == [(f"Summary {i}", ["L3"]) for i in range(1, 4)]
+    assert ScoredLabel.query.filter(ScoredLabel.label_id == 3).count() == 3
+    # Only the topic of the new label is rescored, but for the manually set score
+    assert {
+        (st.article_id, st.topic_id): float(st.score) for st in ScoredTopic.query.all()
+    } == pytest.approx(
+        {
+            (1, 1): 0.2,
+            (1, 2): (0.6 + 1.0 * 3) / 4,
+            (2, 1): 0.2,
+            (2, 2): (0.6 + 1.0 * 3) / 4,
+            (3, 1): 0.2,
+            (3, 2): 0.6,
+        }
+    )
+    # Nothing is left to score
+    assert my_app.scoring_service.score_missing_labels([3]) == 0
+
+
+def test_topic_label_edit_recomputes_the_topic_scores_without_classifying(
+    my_app: FlaskWithServices,
+):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.http_client = StubClassifierClient({})
+    db.session.add(TopicLabel(topic_id=1, label_id=2, weight=1.0))
+    db.session.commit()
+    client = cast(Flask, my_app).test_client()
+
+    response = client.put("/topics/1/label/2", json={"weight": 3.0})
+
+    assert response.status_code == 200
+    assert ai_service.http_client.requests == []
+    assert [
+        float(st.score)
+        for st in ScoredTopic.query.filter(ScoredTopic.topic_id == 1).all()
+    ] == pytest.approx([(0.2 + 0.6 * 3) / 4] * 3)
+    assert (
+        ScoredTopicHistory.query.filter(
+            ScoredTopicHistory.change_type == ChangeType.UPDATE.name
+        ).count()
+        == 3
+    )
+
+    client.put("/topics/1/label/2", json={"enabled": False})
+    client.put("/topics/1/label/1", json={"enabled": False})
+
+    # Left without any enabled label, the topic loses its scores
+    assert ScoredTopic.query.filter(ScoredTopic.topic_id == 1).count() == 0
+    assert client.put("/topics/1/label/1", json={}).status_code == 400
+
+
+@pytest.mark.filterwarnings("error::sqlalchemy.exc.SAWarning")
+def test_enabling_a_topic_label_scores_it_and_removing_it_recomputes_the_topic(
+    my_app: FlaskWithServices,
+):
+    ai_service = cast(HuggingFaceService, my_app.ai_service)
+    ai_service.http_client = StubClassifierClient({"L3": 0.8})
+    db.session.add(TopicLabel(topic_id=1, label_id=3, weight=1.0, enabled=False))
+    db.session.commit()
+    client = cast(Flask, my_app).test_client()
+
+    response = client.put("/topics/1/label/3", json={"enabled": True})
+
+    assert response.status_code == 200
+    job_id = response.get_json()["ingestion_job"]["id"]
+    IngestionWorker(cast(Flask, my_app), worker_id="worker-1").run(once=True)
+    assert db.session.get(IngestionJob, job_id).status == JobStatus.SUCCEEDED.name
+    assert [
+        float(st.score)
+        for st in ScoredTopic.query.filter(ScoredTopic.topic_id == 1).all()
+    ] == pytest.approx([(0.2 + 0.8) / 2] * 3)
+
+    assert client.delete("/topics/1/label/3").status_code == 201
+
+    assert [
+        float(st.score)
+        for st in ScoredTopic.query.filter(ScoredTopic.topic_id == 1).all()
+    ] == pytest.approx([0.2] * 3)
+    assert db.session.get(Label, 3) is None
+    # A label still attached to another topic is only detached
+    db.session.add(TopicLabel(topic_id=2, label_id=1, weight=1.0))
+    db.session.commit()
+    assert client.delete("/topics/2/label/1").status_code == 201
+    assert [(tl.topic_id, tl.label_id) for tl in TopicLabel.query.all()] == [
+        (1, 1),
+        (2, 2),
+    ]
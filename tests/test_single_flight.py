@@ -0,0 +1,47 @@
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app.services import single_flight as single_flight_module
+from app.services.single_flight import SingleFlight
+
+
+def test_waiting_calls_share_the_exception_of_the_call_in_flight(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    joined = threading.Semaphore(0)
+
+    class JoiningFuture(Future):
+        def result(self, timeout: float | None = None):
+            joined.release()
+            return super().result(timeout)
+
+    monkeypatch.setattr(single_flight_module, "Future", JoiningFuture)
+    single_flight = SingleFlight()
+    calls: list[str] = []
+
+    def fail() -> str:
+        calls.append("key")
+        # Only fails once the two other calls are waiting for this one
+        for _ in range(2):
+            assert joined.acquire(timeout=5)
+        raise ValueError("Failed")
+
+    def call() -> Exception | str:
+        try:
+            return single_flight.do("key", fail)
+        except ValueError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        outcomes = list(executor.map(lambda _: call(), range(3)))
+
+    assert len(calls) == 1
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    # Once done, the call is no longer in flight and runs again
+    assert single_flight.do("key", lambda: "Done") == "Done"
@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app.services.embedding_store import EmbeddingStore
+from app.services.sqlite_lru_store import SQLiteLRUStore
+
+
+def test_store_keeps_the_least_recently_used_entries_out_of_memory(tmp_path):
+    path = str(tmp_path / "store.sqlite")
+    store = SQLiteLRUStore[float]("scores", "REAL", max_entries=2, path=path)
+    store.put_many({"a": 0.1, "b": 0.2})
+    store.get_many(["a"])
+    store.put_many({"c": 0.3})
+
+    assert len(store) == 2
+    assert list(store._entries) == ["a", "c"]
+    # Evicted from memory, still stored
+    assert store.get_many(["a", "b", "x"]) == {"a": 0.1, "b": 0.2}
+    reopened = SQLiteLRUStore[float]("scores", "REAL", max_entries=2, path=path)
+    assert reopened.get_many(["a", "b", "c"]) == {"a": 0.1, "b": 0.2, "c": 0.3}
+
+
+def test_store_caps_the_stored_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / "store.sqlite")
+    store = SQLiteLRUStore[str](
+        "texts", "TEXT", max_entries=0, path=path, max_stored_entries=10
+    )
+    clock = iter(range(1000))
+    monkeypatch.setattr("app.services.sqlite_lru_store.time.time", lambda: next(clock))
+    for i in range(10):
+        store.put_many({f"k{i}": f"v{i}"})
+    # Read, so no longer among the least recently used
+    assert store.get_many(["k0"]) == {"k0": "v0"}
+
+    store.put_many({"k10": "v10"})
+
+    stored = store.get_many([f"k{i}" for i in range(11)])
+    assert len(stored) == 9
+    assert "k0" in stored and "k10" in stored
+    assert "k1" not in stored and "k2" not in stored
+
+
+def test_store_starts_over_tables_of_a_previous_version(tmp_path):
+    path = str(tmp_path / "store.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE scores (key TEXT PRIMARY KEY, score REAL)")
+    connection.execute("INSERT INTO scores VALUES ('a', 0.1)")
+    connection.commit()
+    connection.close()
+
+    store = SQLiteLRUStore[float]("scores", "REAL", max_entries=10, path=path)
+    store.put_many({"b": 0.2})
+
+    assert store.get_many(["a", "b"]) == {"b": 0.2}
+
+
+def test_embedding_store_round_trips_float32_vectors(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    EmbeddingStore(path=path).put_many({"a": np.array([0.6, 0.8])})
+
+    vector = EmbeddingStore(path=path).get_many(["a"])["a"]
+
+    assert vector.dtype == np.float32
+    assert np.allclose(vector, [0.6, 0.8])
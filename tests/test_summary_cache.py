@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app.services.summary_cache import SummaryCache
+
+
+def test_summary_keys_ignore_whitespace_but_not_the_model():
+    key = SummaryCache.get_key("m1", "Long text")
+
+    assert SummaryCache.get_key("m1", " Long\n\ttext  ") == key
+    assert SummaryCache.get_key("m1", "Longtext") != key
+    assert SummaryCache.get_key("m2", "Long text") != key
+
+
+def test_summaries_evicted_from_memory_are_read_back_from_the_database(tmp_path):
+    path = str(tmp_path / "summaries.sqlite")
+    cache = SummaryCache(max_entries=1, path=path)
+    cache.put("k1", "S1")
+    cache.put("k2", "S2")
+
+    assert cache.get_stats()["entries"] == 1
+    assert cache.get("k1") == "S1"
+    assert SummaryCache(path=path).get("k2") == "S2"
+
+
+def test_summaries_evicted_from_memory_only_are_lost_and_counted_as_misses():
+    cache = SummaryCache(max_entries=1)
+    cache.put("k1", "S1")
+    cache.put("k2", "S2")
+
+    assert cache.get("k1") is None
+    assert cache.get("k2") == "S2"
+    assert cache.get_stats() == {
+        "hits": 1,
+        "misses": 1,
+        "hit_ratio": 0.5,
+        "entries": 1,
+    }
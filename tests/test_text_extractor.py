@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app.services import extraction_executor as extraction_executor_module
+from app.services.extraction_executor import ExtractionExecutor
+from app.services.soup_text_extractor import SoupTextExtractor
+from app.services.streaming_text_extractor import StreamingTextExtractor
+from app.services.text_extractor import TextExtractor
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="iso-8859-1"><title>Page title</title>
+<style>p { color: red; }</style><script>var s = "<p>not text</p>";</script></head>
+<body><header><nav><ul><li><a href="/">Home</a></li></ul></nav></header>
+<article><h1>Caf\xe9   news</h1><p>First paragraph &amp; more.</p>
+<p>Second<br>line</p><noscript>Enable JavaScript</noscript></article>
+<aside>Related</aside><footer>Copyright</footer></body></html>""".encode("iso-8859-1")
+
+
+@pytest.mark.parametrize("extractor_cls", [SoupTextExtractor, StreamingTextExtractor])
+def test_extract_keeps_only_the_readable_text(extractor_cls: type[TextExtractor]):
+    assert extractor_cls().extract(PAGE) == (
+        "Café news\nFirst paragraph & more.\nSecond\nline"
+    )
+    assert extractor_cls(max_chars=15).extract(PAGE) == "Café news\nFirst"
+
+
+def test_streaming_extract_stops_at_the_budget():
+    page = b"<html><body>" + b"<p>Lorem ipsum dolor sit amet.</p>" * 100000
+    text = StreamingTextExtractor(max_chars=1000).extract(page + b"<p>\xff\xfe")
+
+    assert len(text) == 1000
+    assert text.startswith("Lorem ipsum dolor sit amet.\nLorem")
+
+
+def test_extraction_executor_extracts_in_worker_processes():
+    extraction_executor = ExtractionExecutor(StreamingTextExtractor(), processes=1)
+    try:
+        assert extraction_executor.extract(PAGE) == StreamingTextExtractor().extract(
+            PAGE
+        )
+    finally:
+        extraction_executor.shutdown()
+
+
+def test_extraction_executor_shuts_its_pool_down_on_exit(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    exit_handlers = []
+    monkeypatch.setattr(
+        extraction_executor_module.atexit, "register", exit_handlers.append
+    )
+    monkeypatch.setattr(
+        extraction_executor_module.atexit, "unregister", exit_handlers.remove
+    )
+    extraction_executor = ExtractionExecutor(StreamingTextExtractor(), processes=1)
+    extraction_executor.extract(PAGE)
+    assert exit_handlers == [extraction_executor.shutdown]
+
+    exit_handlers[0]()
+
+    assert exit_handlers == []
+    assert extraction_executor._pool is None
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from app.services.topic_scoring_engine import TopicScoringEngine
+
+
+def test_get_topic_scores_weighs_the_scored_labels_of_each_topic():
+    engine = TopicScoringEngine(
+        [1, 2, 3], [(1, 10, 1.0), (2, 10, 3.0), (2, 20, 0.0), (3, 30, 2.0)]
+    )
+
+    topic_scores, topics_scored = engine.get_topic_scores(
+        np.array([[0.2, 0.6, 0.9], [0.4, 0.0, 0.0]]),
+        np.array([[True, True, True], [True, False, False]]),
+    )
+
+    assert engine.topic_ids == [10, 20, 30]
+    assert topic_scores[0] == pytest.approx([(0.2 * 1 + 0.6 * 3) / 4, 0.0, 0.9])
+    assert topics_scored.tolist() == [[True, True, True], [True, False, False]]
+    # The label left unscored counts neither in the score nor in the scale of its topic
+    assert topic_scores[1][0] == pytest.approx(0.4)